@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Mide la latencia del event loop con el FileHandler síncrono frente al
+pipeline de logging con cola (log_pipeline.py).
+
+Uso: python3 bench_logging.py [directorio_temporal]
+"""
+
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from log_pipeline import setup_logging
+
+
+def reset_logging():
+    """Elimina los handlers del logger raíz"""
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        handler.close()
+        root.removeHandler(handler)
+
+
+async def measure_loop_lag(messages_per_tick=20, ticks=500, tick_seconds=0.002):
+    """Registra mensajes en cada tick y mide el retraso sobre el sleep esperado"""
+    logger = logging.getLogger('bench')
+    lags = []
+    for i in range(ticks):
+        start = time.perf_counter()
+        for j in range(messages_per_tick):
+            logger.info(f"Índice UV obtenido: {i % 11}.{j % 10} - chequeo {i}/{j}")
+        await asyncio.sleep(tick_seconds)
+        lags.append((time.perf_counter() - start - tick_seconds) * 1000)
+    return lags
+
+
+def report(name, lags):
+    lags = sorted(lags)
+    p50 = statistics.median(lags)
+    p99 = lags[int(len(lags) * 0.99) - 1]
+    print(f"{name:<28} p50={p50:7.3f} ms  p99={p99:7.3f} ms  max={lags[-1]:7.3f} ms")
+
+
+def main():
+    workdir = sys.argv[1] if len(sys.argv) > 1 else tempfile.mkdtemp(prefix='uvlog-')
+    os.makedirs(workdir, exist_ok=True)
+    devnull = open(os.devnull, 'w')
+
+    # Antes: basicConfig con FileHandler síncrono (consola a /dev/null para aislar el disco)
+    reset_logging()
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler(devnull),
+                  logging.FileHandler(os.path.join(workdir, 'sync.log'))]
+    )
+    report("FileHandler síncrono", asyncio.run(measure_loop_lag()))
+
+    # Después: pipeline con cola, rotación y muestreo desactivado para comparar igual carga
+    reset_logging()
+    listener = setup_logging(log_file=os.path.join(workdir, 'queued.log'), sample_window_seconds=0)
+    listener.handlers[0].setStream(devnull)
+    report("Pipeline con cola", asyncio.run(measure_loop_lag()))
+    listener.stop()
+
+    print(f"Ficheros de prueba en {workdir}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Generador de carga offline para los comandos del bot.
+
+Reproduce miles de updates /crema y /status contra una Bot API falsa (sin
+red) usando los handlers reales de UVMonitor, primero en modo secuencial y
+después con updates concurrentes. Informa de la latencia p50/p99 (desde que
+el update entra en la cola hasta que el handler responde) y del throughput.
+
+Uso: python3 bot_load_test.py [nº_updates] [latencia_api_ms]
+"""
+
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Entorno aislado antes de importar el monitor (no toca /app/logs)
+_WORKDIR = tempfile.mkdtemp(prefix='uv-load-')
+os.environ.setdefault('TELEGRAM_BOT_TOKEN', '123456:LOADTEST')
+os.environ.setdefault('TELEGRAM_CHAT_ID', '1')
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+os.environ.setdefault('LOG_FILE', os.path.join(_WORKDIR, 'uv_monitor.log'))
+os.environ.setdefault('SUNSCREEN_FILE', os.path.join(_WORKDIR, 'sunscreen_tracking.json'))
+os.environ.setdefault('UV_SNAPSHOT_FILE', os.path.join(_WORKDIR, 'uv_snapshot.bin'))
+os.environ.setdefault('CHECKPOINT_FILE', os.path.join(_WORKDIR, 'monitor_state.json'))
+os.environ.setdefault('REQUEST_BUDGET_FILE', os.path.join(_WORKDIR, 'request_budget.json'))
+
+from telegram import Update
+from telegram.ext import Application
+from telegram.request import BaseRequest
+
+from log_pipeline import setup_logging_from_env
+from uv_monitor import UVMonitor
+
+_CHAT_ID_BASE = 100000
+
+
+class FakeBotAPIRequest(BaseRequest):
+    """Bot API simulada: responde en memoria con una latencia fija"""
+
+    def __init__(self, latency_seconds: float):
+        self.latency_seconds = latency_seconds
+        self.replies = {}
+        self.expected = 0
+        self.done = asyncio.Event()
+        self._message_id = 0
+
+    @property
+    def read_timeout(self):
+        return 5.0
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    async def do_request(self, url, method, request_data=None, read_timeout=None,
+                         write_timeout=None, connect_timeout=None, pool_timeout=None):
+        endpoint = url.rsplit('/', 1)[-1]
+        params = request_data.parameters if request_data else {}
+
+        if endpoint == 'getMe':
+            result = {'id': 1, 'is_bot': True, 'first_name': 'UV', 'username': 'uv_load_bot'}
+        elif endpoint == 'sendMessage':
+            await asyncio.sleep(self.latency_seconds)
+            self._message_id += 1
+            chat_id = int(params['chat_id'])
+            self.replies[chat_id] = time.perf_counter()
+            if len(self.replies) >= self.expected:
+                self.done.set()
+            result = {
+                'message_id': self._message_id,
+                'date': int(time.time()),
+                'chat': {'id': chat_id, 'type': 'private'},
+                'text': params.get('text', ''),
+            }
+        else:
+            result = True
+
+        return 200, json.dumps({'ok': True, 'result': result}).encode()
+
+
+def build_update(bot, index: int, command: str) -> Update:
+    """Update de Telegram con un comando, en un chat distinto por update"""
+    return Update.de_json({
+        'update_id': index,
+        'message': {
+            'message_id': index,
+            'date': int(time.time()),
+            'chat': {'id': _CHAT_ID_BASE + index, 'type': 'private'},
+            'from': {'id': _CHAT_ID_BASE + index, 'is_bot': False, 'first_name': 'Carga'},
+            'text': command,
+            'entities': [{'type': 'bot_command', 'offset': 0, 'length': len(command.split()[0])}],
+        }
+    }, bot)
+
+
+async def run_scenario(monitor: UVMonitor, total: int, latency_seconds: float, concurrency: int):
+    """Lanza `total` updates y devuelve (latencias_ms, duración_s)"""
+    fake_api = FakeBotAPIRequest(latency_seconds)
+    fake_api.expected = total
+
+    builder = (Application.builder()
+               .token(monitor.telegram_token)
+               .request(fake_api)
+               .get_updates_request(FakeBotAPIRequest(0))
+               .updater(None))
+    if concurrency > 0:
+        builder = builder.concurrent_updates(concurrency)
+    application = builder.build()
+    monitor.register_handlers(application)
+
+    await application.initialize()
+    await application.start()
+
+    commands = ['/crema 30', '/status', '/status', '/crema', '/status']
+    updates = [build_update(application.bot, i, commands[i % len(commands)]) for i in range(total)]
+
+    sent_at = {}
+    start = time.perf_counter()
+    for index, update in enumerate(updates):
+        sent_at[_CHAT_ID_BASE + index] = time.perf_counter()
+        await application.update_queue.put(update)
+
+    await asyncio.wait_for(fake_api.done.wait(), timeout=max(60, total * latency_seconds * 2))
+    duration = time.perf_counter() - start
+
+    await application.stop()
+    await application.shutdown()
+
+    latencies = [(fake_api.replies[chat_id] - sent) * 1000
+                 for chat_id, sent in sent_at.items() if chat_id in fake_api.replies]
+    return latencies, duration
+
+
+def report(name, latencies, duration):
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies)
+    p99 = latencies[max(0, int(len(latencies) * 0.99) - 1)]
+    print(f"{name:<26} n={len(latencies):<6} p50={p50:9.1f} ms  p99={p99:9.1f} ms  "
+          f"throughput={len(latencies) / duration:8.1f} updates/s")
+
+
+async def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    monitor = UVMonitor()
+    monitor.current_uv_index = 7.5
+
+    print(f"🧪 {total} updates /crema y /status, latencia Bot API simulada {latency_ms} ms")
+    for name, concurrency in (("Secuencial", 0), ("Concurrente (32)", 32), ("Concurrente (256)", 256)):
+        latencies, duration = await run_scenario(monitor, total, latency_ms / 1000, concurrency)
+        report(name, latencies, duration)
+
+
+if __name__ == "__main__":
+    setup_logging_from_env()
+    asyncio.run(main())
@@ -3,12 +3,40 @@
 Script para consultar el índice UV actual en Vitoria-Gasteiz
 """
 
+import os
 import requests
 import json
 from datetime import datetime
+from uv_snapshot import read_snapshot
+
+# Antigüedad máxima del snapshot del monitor antes de consultar la red
+SNAPSHOT_MAX_AGE_MINUTES = float(os.getenv('UV_SNAPSHOT_MAX_AGE_MINUTES', '75'))
+
+def show_snapshot(snapshot):
+    """Muestra la lectura publicada por el monitor en ejecución"""
+    print("🌞 ÍNDICE UV - MONITOR LOCAL")
+    print("=" * 40)
+    print(f"📅 Actualizado: {datetime.fromtimestamp(snapshot['updated_at']).strftime('%d/%m/%Y %H:%M')}")
+    print("=" * 40)
+    print(f"🔢 Índice UV: {snapshot['uv_index']}")
+    print(f"📡 Proveedor: {snapshot['provider']}")
+    if snapshot['data_time']:
+        print(f"🕐 Hora medición: {datetime.fromtimestamp(snapshot['data_time']).strftime('%H:%M')}")
+    estado = "⚠️  Peligroso" if snapshot['is_dangerous'] else "✅ Seguro"
+    print(f"📊 Estado: {estado} (umbral {snapshot['threshold']})")
+    
+    if snapshot['forecast']:
+        print(f"\n📈 Previsión:")
+        for epoch, uv in snapshot['forecast'][:5]:
+            print(f"   {datetime.fromtimestamp(epoch).strftime('%H:%M')} → UV: {uv}")
 
 def get_current_uv():
-    """Obtiene el UV actual de Euskalmet"""
+    """Obtiene el UV actual del monitor local o, si no está disponible, de Euskalmet"""
+    snapshot = read_snapshot(max_age_minutes=SNAPSHOT_MAX_AGE_MINUTES)
+    if snapshot:
+        show_snapshot(snapshot)
+        return
+    
     try:
         # URL de la API de Euskalmet
         url = "https://api.euskalmet.euskadi.eus/uvi/estaciones/uvi/horaria"
@@ -0,0 +1,126 @@
+"""
+Recarga en caliente de la configuración del monitor.
+
+Lee un fichero KEY=VALUE (mismo formato que .env) al recibir SIGHUP o al
+detectar que ha cambiado, valida todos los valores y los aplica de una vez
+sobre el UVMonitor en ejecución, sin reiniciar el polling de Telegram ni
+perder cachés ni estado.
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Ajustes recargables: nombre -> (conversión, mínimo, máximo)
+RELOADABLE_SETTINGS = {
+    'UV_THRESHOLD': (float, 0, 20),
+    'SKIN_TYPE': (int, 1, 6),
+    'CHECK_INTERVAL_MINUTES': (int, 1, 720),
+}
+
+
+def read_config_file(path: str) -> dict:
+    """Lee un fichero KEY=VALUE ignorando comentarios y líneas vacías"""
+    values = {}
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#') or '=' not in line:
+                continue
+            key, value = line.split('=', 1)
+            values[key.strip()] = value.strip().strip('"\'')
+    return values
+
+
+def validate_settings(raw: dict) -> dict:
+    """Convierte y valida los ajustes recargables. Lanza ValueError si alguno es inválido"""
+    settings = {}
+    errors = []
+    for name, (convert, minimum, maximum) in RELOADABLE_SETTINGS.items():
+        if name not in raw:
+            continue
+        try:
+            value = convert(raw[name])
+        except ValueError:
+            errors.append(f"{name}={raw[name]!r} no es válido")
+            continue
+        if not minimum <= value <= maximum:
+            errors.append(f"{name}={value} fuera de rango [{minimum}, {maximum}]")
+            continue
+        settings[name] = value
+
+    if errors:
+        raise ValueError('; '.join(errors))
+    return settings
+
+
+class ConfigReloader:
+    """Vigila el fichero de configuración y recarga con SIGHUP o al cambiar"""
+
+    def __init__(self, monitor, path: str, poll_seconds: float = 10):
+        self.monitor = monitor
+        self.path = path
+        self.poll_seconds = poll_seconds
+        self._mtime = self._current_mtime()
+        self._task = None
+
+    def _current_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def start(self):
+        # Lo guardado en el fichero prevalece sobre el entorno también tras un reinicio;
+        # si no es válido, reload() lo registra y se siguen usando los valores del entorno
+        if Path(self.path).exists():
+            self.reload()
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGHUP, self.reload)
+        except (NotImplementedError, RuntimeError, AttributeError):
+            logger.warning("SIGHUP no disponible: solo se vigilará el fichero")
+        if self.poll_seconds > 0:
+            self._task = asyncio.create_task(self.watch())
+        logger.info(f"Recarga de configuración activa: SIGHUP o cambios en {self.path}")
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+        try:
+            asyncio.get_running_loop().remove_signal_handler(signal.SIGHUP)
+        except (NotImplementedError, RuntimeError, AttributeError):
+            pass
+
+    async def watch(self):
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            mtime = self._current_mtime()
+            if mtime is not None and mtime != self._mtime:
+                self._mtime = mtime
+                self.reload()
+
+    def reload(self) -> bool:
+        """Relee, valida y aplica. Si algo es inválido no se aplica nada"""
+        start = time.perf_counter()
+        if not Path(self.path).exists():
+            logger.warning(f"Recarga ignorada: no existe {self.path}")
+            return False
+        try:
+            settings = validate_settings(read_config_file(self.path))
+        except (OSError, ValueError) as e:
+            logger.error(f"Configuración no aplicada: {e}")
+            return False
+
+        changes = self.monitor.apply_settings(settings)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if changes:
+            logger.info(f"Configuración recargada en {elapsed_ms:.1f} ms: {', '.join(changes)}")
+        else:
+            logger.info(f"Configuración recargada en {elapsed_ms:.1f} ms: sin cambios")
+        return True
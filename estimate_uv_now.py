@@ -3,12 +3,31 @@
 Script para estimar el índice UV actual en Vitoria-Gasteiz
 """
 
+import os
 from datetime import datetime
 import math
+from uv_snapshot import read_snapshot
+
+# Antigüedad máxima del snapshot del monitor antes de recurrir a la estimación
+SNAPSHOT_MAX_AGE_MINUTES = float(os.getenv('UV_SNAPSHOT_MAX_AGE_MINUTES', '75'))
 
 def estimate_current_uv():
     """Estima el UV actual basándose en hora y época del año"""
     
+    # Si el monitor tiene una lectura reciente, usarla en lugar de estimar
+    snapshot = read_snapshot(max_age_minutes=SNAPSHOT_MAX_AGE_MINUTES)
+    if snapshot:
+        print("🌞 ÍNDICE UV (MONITOR LOCAL) - VITORIA-GASTEIZ")
+        print("=" * 40)
+        print(f"📅 Actualizado: {datetime.fromtimestamp(snapshot['updated_at']).strftime('%d/%m/%Y %H:%M')}")
+        print("=" * 40)
+        print(f"\n📊 UV actual: {snapshot['uv_index']} (fuente: {snapshot['provider']})")
+        if snapshot['forecast']:
+            print("\n📈 Previsión próximas horas:")
+            for epoch, uv in snapshot['forecast'][:4]:
+                print(f"   {datetime.fromtimestamp(epoch).strftime('%H:%M')} → UV: {uv}")
+        return
+    
     now = datetime.now()
     hour = now.hour
     minute = now.minute
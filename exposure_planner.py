@@ -0,0 +1,86 @@
+"""
+Ventanas de exposición segura del día por tipo de piel.
+
+Con cada previsión nueva se calcula, para los seis tipos de piel, el UV
+máximo que permite una salida de `exposure_minutes` sin quemarse y, sobre
+la curva prevista (interpolada linealmente), los intervalos seguros y
+peligrosos del día y las mejores ventanas. /planificar y el resumen de la
+mañana solo leen el plan ya calculado.
+"""
+
+from datetime import datetime
+from typing import List, Tuple
+
+# Minutos hasta quemadura con UV 1 según tipo de piel (sin protección)
+BURN_BASE_MINUTES = {
+    1: 67,   # Tipo I - Muy clara
+    2: 100,  # Tipo II - Clara
+    3: 200,  # Tipo III - Media
+    4: 300,  # Tipo IV - Morena
+    5: 400,  # Tipo V - Muy morena
+    6: 500   # Tipo VI - Negra
+}
+
+# Duración mínima de una ventana para recomendarla
+MIN_WINDOW_MINUTES = 30
+
+
+def safe_uv_limit(skin_type: int, exposure_minutes: float, factor: float = 0.5) -> float:
+    """UV máximo con el que `exposure_minutes` al sol no llegan a quemar"""
+    return BURN_BASE_MINUTES.get(skin_type, 100) * factor / exposure_minutes
+
+
+def _split_by_limit(points: List[Tuple[float, float]], limit: float):
+    """Recorre la curva y devuelve tramos (inicio, fin, seguro, pico, media)"""
+    segments = []
+    start, safe = points[0][0], points[0][1] <= limit
+    peak, area = points[0][1], 0.0
+
+    for (t0, u0), (t1, u1) in zip(points, points[1:]):
+        # Cruce del límite dentro del tramo: cortar en el punto interpolado
+        if (u0 <= limit) != (u1 <= limit):
+            cross = t0 + (limit - u0) / (u1 - u0) * (t1 - t0)
+            area += (u0 + limit) / 2 * (cross - t0)
+            segments.append((start, cross, safe, max(peak, limit), area / max(cross - start, 1)))
+            start, safe, peak, area = cross, not safe, limit, (limit + u1) / 2 * (t1 - cross)
+        else:
+            area += (u0 + u1) / 2 * (t1 - t0)
+        peak = max(peak, u1)
+
+    end = points[-1][0]
+    if end > start:
+        segments.append((start, end, safe, peak, area / (end - start)))
+    return segments
+
+
+def build_day_plan(forecast, day_start: datetime, day_end: datetime,
+                   exposure_minutes: float = 30, factor: float = 0.5) -> dict:
+    """Plan del día para todos los tipos de piel a partir de la previsión [(epoch, uv)]"""
+    start, end = day_start.timestamp(), day_end.timestamp()
+    points = sorted((epoch, uv) for epoch, uv in forecast if start <= epoch <= end)
+    plan = {
+        'dia': day_start.date().isoformat(),
+        'minutos_exposicion': exposure_minutes,
+        'perfiles': {},
+    }
+    if len(points) < 2:
+        return plan
+
+    for skin_type in BURN_BASE_MINUTES:
+        limit = safe_uv_limit(skin_type, exposure_minutes, factor)
+        segments = _split_by_limit(points, limit)
+        safe = [(s, e) for s, e, ok, _, _ in segments if ok]
+        # Mejores ventanas: tramos seguros suficientemente largos, primero los de menor
+        # UV medio; a igual UV medio, el más largo
+        best = sorted(
+            ((s, e, round(mean, 1)) for s, e, ok, _, mean in segments
+             if ok and e - s >= MIN_WINDOW_MINUTES * 60),
+            key=lambda window: (window[2], window[0] - window[1])
+        )[:3]
+        plan['perfiles'][skin_type] = {
+            'limite_uv': round(limit, 1),
+            'seguros': safe,
+            'peligrosos': [(s, e, round(peak, 1)) for s, e, ok, peak, _ in segments if not ok],
+            'mejores': best,
+        }
+    return plan
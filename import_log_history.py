@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Importa el histórico UV a partir de los ficheros uv_monitor.log existentes.
+
+Lee logs grandes y rotados (.gz incluidos) en una sola pasada y con memoria
+constante: los ficheros planos se mapean con mmap y se recorren con una
+expresión regular sobre bytes; los comprimidos se leen en streaming.
+Agrega por día el pico UV, el tiempo sobre el umbral y la disponibilidad de
+cada proveedor, y lo fusiona en el histórico diario en JSON.
+
+Uso: python3 import_log_history.py [ficheros...] [--umbral 6] [--salida fichero.json]
+"""
+
+import argparse
+import glob
+import gzip
+import json
+import mmap
+import os
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+
+DEFAULT_HISTORY_FILE = os.getenv('UV_HISTORY_FILE', '/app/logs/uv_daily_history.json')
+
+# Solo interesan las líneas con lecturas o fallos de proveedor
+_LINE_RE = re.compile(
+    rb'^(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)[,.]\d+ - [^\n]*? - (\w+) - ('
+    rb'(?:UV obtenido de|\xc3\x8dndice UV obtenido|UV estimado por tiempo|'
+    rb'Error conectando con|Error procesando respuesta de|CurrentUVIndex datos|'
+    rb'CurrentUVIndex API|OpenUV API error)[^\n]*)$',
+    re.MULTILINE
+)
+_JSON_HINT = b'"msg"'
+
+_PROVIDER_RE = re.compile(r'UV obtenido de (CurrentUVIndex|OpenUV): ([\d.]+)')
+_ESTIMATE_RE = re.compile(r'UV estimado por tiempo: ([\d.]+)')
+_READING_RE = re.compile(r'Índice UV obtenido: ([\d.]+)')
+
+# Hueco máximo entre lecturas que se cuenta como tiempo sobre el umbral
+MAX_GAP_MINUTES = 60
+
+
+def iter_file_events(path):
+    """Genera (datetime, nivel, mensaje) para las líneas relevantes de un log"""
+    if path.endswith('.gz'):
+        with gzip.open(path, 'rb') as f:
+            for line in f:
+                yield from _parse_chunk(line.rstrip(b'\n'))
+        return
+
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Logs en formato JSON (LOG_JSON=true): recorrer línea a línea
+            if mm.find(_JSON_HINT, 0, 4096) != -1:
+                for line in iter(mm.readline, b''):
+                    yield from _parse_chunk(line.rstrip(b'\n'))
+                return
+            for match in _LINE_RE.finditer(mm):
+                yield _to_event(*match.groups())
+
+
+def _parse_chunk(line):
+    """Interpreta una línea suelta (texto o JSON)"""
+    if line.startswith(b'{'):
+        try:
+            entry = json.loads(line)
+            ts = entry['ts'].replace('T', ' ')
+            event = (ts.encode(), entry['level'].encode(), entry['msg'].encode('utf-8'))
+        except (ValueError, KeyError):
+            return
+        if _LINE_RE.match(b'%s,0 - x - %s - %s' % event):
+            yield _to_event(*event)
+        return
+
+    match = _LINE_RE.match(line)
+    if match:
+        yield _to_event(*match.groups())
+
+
+def _to_event(ts, level, message):
+    return (datetime.strptime(ts.decode(), '%Y-%m-%d %H:%M:%S'),
+            level.decode(), message.decode('utf-8', errors='replace'))
+
+
+def iter_readings(events):
+    """Convierte eventos del log en lecturas y resultados de proveedor.
+
+    Genera ('lectura', datetime, uv, proveedor) y ('proveedor', datetime, nombre, ok).
+    """
+    pending_provider = None
+    for when, level, message in events:
+        match = _PROVIDER_RE.search(message)
+        if match:
+            pending_provider = match.group(1).lower()
+            yield ('proveedor', when, pending_provider, True)
+            continue
+
+        match = _ESTIMATE_RE.search(message)
+        if match:
+            pending_provider = 'estimacion'
+            continue
+
+        match = _READING_RE.search(message)
+        if match:
+            yield ('lectura', when, float(match.group(1)), pending_provider or 'desconocido')
+            pending_provider = None
+            continue
+
+        if level in ('WARNING', 'ERROR'):
+            if 'CurrentUVIndex' in message:
+                yield ('proveedor', when, 'currentuvindex', False)
+            elif 'OpenUV' in message:
+                yield ('proveedor', when, 'openuv', False)
+
+
+class DailyAggregator:
+    """Agregados diarios en una sola pasada (memoria proporcional al nº de días)"""
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.days = {}
+        self._last = None  # (datetime, uv)
+
+    def _day(self, when):
+        key = when.date().isoformat()
+        day = self.days.get(key)
+        if day is None:
+            day = self.days[key] = {
+                'peak_uv': 0.0,
+                'peak_time': None,
+                'minutes_above_threshold': 0.0,
+                'readings': 0,
+                'sources': {},
+                'providers': {},
+            }
+        return day
+
+    def add(self, item):
+        kind, when = item[0], item[1]
+        day = self._day(when)
+
+        if kind == 'proveedor':
+            _, _, provider, ok = item
+            stats = day['providers'].setdefault(provider, {'ok': 0, 'fallos': 0})
+            stats['ok' if ok else 'fallos'] += 1
+            return
+
+        _, _, uv, provider = item
+        day['readings'] += 1
+        day['sources'][provider] = day['sources'].get(provider, 0) + 1
+        if uv > day['peak_uv']:
+            day['peak_uv'] = uv
+            day['peak_time'] = when.strftime('%H:%M')
+
+        if self._last is not None:
+            last_when, last_uv = self._last
+            gap = (when - last_when).total_seconds() / 60
+            if last_when.date() == when.date() and 0 < gap <= MAX_GAP_MINUTES and last_uv >= self.threshold:
+                day['minutes_above_threshold'] += gap
+        self._last = (when, uv)
+
+    def result(self):
+        for day in self.days.values():
+            day['minutes_above_threshold'] = round(day['minutes_above_threshold'])
+            for stats in day['providers'].values():
+                total = stats['ok'] + stats['fallos']
+                stats['disponibilidad'] = round(stats['ok'] / total, 3) if total else None
+        return self.days
+
+
+def ordered_log_files(patterns):
+    """Expande patrones y ordena del más antiguo al más reciente"""
+    paths = set()
+    for pattern in patterns:
+        paths.update(p for p in glob.glob(pattern) if os.path.isfile(p))
+    return sorted(paths, key=os.path.getmtime)
+
+
+def import_logs(paths, threshold):
+    """Procesa los ficheros en orden y devuelve los agregados diarios"""
+    aggregator = DailyAggregator(threshold)
+    for path in paths:
+        for item in iter_readings(iter_file_events(path)):
+            aggregator.add(item)
+    return aggregator.result()
+
+
+def merge_history(history_file, days):
+    """Fusiona los días importados con el histórico existente (los importados prevalecen)"""
+    history = {}
+    if Path(history_file).exists():
+        with open(history_file, 'r') as f:
+            history = json.load(f)
+    history.update(days)
+
+    path = Path(history_file)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, 'w') as f:
+        json.dump(dict(sorted(history.items())), f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+    return history
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa histórico UV desde uv_monitor.log")
+    parser.add_argument('files', nargs='*', default=['/app/logs/uv_monitor.log*'],
+                        help="Ficheros o patrones de log (por defecto /app/logs/uv_monitor.log*)")
+    parser.add_argument('--umbral', type=float, default=float(os.getenv('UV_THRESHOLD', '6')))
+    parser.add_argument('--salida', default=DEFAULT_HISTORY_FILE)
+    args = parser.parse_args()
+
+    paths = ordered_log_files(args.files)
+    if not paths:
+        print("❌ No se encontraron ficheros de log")
+        return
+
+    start = time.perf_counter()
+    days = import_logs(paths, args.umbral)
+    elapsed = time.perf_counter() - start
+    merge_history(args.salida, days)
+
+    readings = sum(day['readings'] for day in days.values())
+    print(f"📥 {len(paths)} ficheros, {readings} lecturas, {len(days)} días en {elapsed:.2f}s")
+    print(f"💾 Histórico guardado en {args.salida}")
+    for key in sorted(days)[-5:]:
+        day = days[key]
+        print(f"   {key} → pico UV {day['peak_uv']} a las {day['peak_time']}, "
+              f"{day['minutes_above_threshold']} min sobre el umbral")
+
+
+if __name__ == "__main__":
+    main()
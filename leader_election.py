@@ -0,0 +1,213 @@
+import fcntl
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderElection:
+    """Elección de líder entre réplicas mediante un lock de fichero (flock)"""
+
+    def __init__(self, lock_file: str):
+        self.lock_file = lock_file
+        self._fd = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._fd is not None
+
+    def try_acquire(self) -> bool:
+        """Intenta ser líder sin bloquear. Devuelve True si este proceso es el líder"""
+        if self._fd is not None:
+            return True
+
+        try:
+            Path(self.lock_file).parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError as e:
+            logger.error(f"Error abriendo lock de líder: {e}")
+            return False
+
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            # Otro proceso mantiene el lock
+            os.close(fd)
+            return False
+
+        # El kernel libera el lock si el proceso muere: la conmutación es automática
+        os.ftruncate(fd, 0)
+        os.write(fd, f"{os.getpid()}\n".encode())
+        self._fd = fd
+        logger.info(f"Este proceso (pid {os.getpid()}) es ahora el líder")
+        return True
+
+    def release(self):
+        """Libera el liderazgo"""
+        if self._fd is None:
+            return
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+        except OSError as e:
+            logger.warning(f"Error liberando lock de líder: {e}")
+        finally:
+            self._fd = None
+
+
+class ReadingBus:
+    """Publica la última lectura UV del líder y el estado de alertas por chat en ficheros compartidos.
+
+    La lectura vive en `state_file`; el estado de cada chat en su propio fichero
+    con su propio lock, de modo que entregar a un chat no bloquea al líder ni
+    a los demás chats.
+    """
+
+    # Segundos tras los que una reclamación sin terminar se da por abandonada
+    CLAIM_TIMEOUT_SECONDS = 300
+
+    def __init__(self, state_file: str):
+        self.state_file = state_file
+        self.lock_file = f"{state_file}.lock"
+
+    def _chat_file(self, chat_id) -> str:
+        return f"{self.state_file}.chat-{chat_id}.json"
+
+    def _chat_lock_file(self, chat_id) -> str:
+        return f"{self.state_file}.chat-{chat_id}.lock"
+
+    @staticmethod
+    def _read_json(path: str) -> dict:
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.error(f"Error leyendo estado compartido {path}: {e}")
+            return {}
+
+    def read(self) -> dict:
+        """Lee el estado compartido de la lectura"""
+        return self._read_json(self.state_file)
+
+    @staticmethod
+    def _write_json(path_str: str, state: dict):
+        """Escritura atómica: fichero temporal + rename"""
+        path = Path(path_str)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp, 'w') as f:
+            json.dump(state, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def _write(self, state: dict):
+        self._write_json(self.state_file, state)
+
+    @contextmanager
+    def locked(self, lock_file: str = None):
+        """Sección crítica entre procesos (bloqueante: llamar fuera del event loop)"""
+        lock_file = lock_file or self.lock_file
+        Path(lock_file).parent.mkdir(parents=True, exist_ok=True)
+        with open(lock_file, 'a') as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def try_lock(self, chat_id):
+        """Lock no bloqueante del chat: devuelve el fichero bloqueado o None"""
+        lock_file = self._chat_lock_file(chat_id)
+        Path(lock_file).parent.mkdir(parents=True, exist_ok=True)
+        f = open(lock_file, 'a')
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return f
+        except OSError:
+            f.close()
+            return None
+
+    @staticmethod
+    def unlock(f):
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        finally:
+            f.close()
+
+    def publish_reading(self, uv_index: float, provider=None, data_time=None, forecast=None,
+                        confidence=None, trace_id=None) -> int:
+        """Publica una nueva lectura y devuelve su número de secuencia (bloqueante)"""
+        with self.locked():
+            state = self.read()
+            seq = state.get('reading', {}).get('seq', 0) + 1
+            state['reading'] = {
+                'seq': seq,
+                'uv_index': uv_index,
+                'provider': provider,
+                'data_time': data_time,
+                'forecast': list(forecast or []),
+                'confidence': confidence,
+                'trace_id': trace_id,
+                'fetched_at': time.time(),
+                'fetched_at_iso': datetime.now().isoformat(),
+                'leader_pid': os.getpid(),
+            }
+            self._write(state)
+        return seq
+
+    def latest_reading(self) -> dict:
+        return self.read().get('reading', {})
+
+    def record_attempt(self):
+        """Anota que el líder va a consultar las APIs, salga bien o no (bloqueante)"""
+        with self.locked():
+            state = self.read()
+            state['attempted_at'] = time.time()
+            self._write(state)
+
+    def last_attempt_at(self) -> float:
+        """Última consulta del líder: también cuentan las que no obtuvieron lectura"""
+        state = self.read()
+        return max(state.get('attempted_at', 0), state.get('reading', {}).get('fetched_at', 0))
+
+    def get_chat_state(self, chat_id) -> dict:
+        return self._read_json(self._chat_file(chat_id))
+
+    def claim_chat(self, chat_id, seq: int):
+        """Reclama la entrega de la lectura `seq` a un chat sin bloquear.
+
+        Devuelve (resultado, estado_del_chat) con resultado 'reclamada',
+        'procesada' (otra réplica ya la entregó o la está entregando) u
+        'ocupado' (lock tomado en este instante: reintentar en el próximo sondeo).
+        El lock solo se mantiene durante la lectura y escritura del fichero.
+        """
+        lock = self.try_lock(chat_id)
+        if lock is None:
+            return 'ocupado', {}
+        try:
+            chat_state = self.get_chat_state(chat_id)
+            claim_age = time.time() - chat_state.get('claimed_at', 0)
+            if chat_state.get('seq', 0) >= seq:
+                return 'procesada', chat_state
+            if chat_state.get('en_curso') and claim_age < self.CLAIM_TIMEOUT_SECONDS:
+                # Otra réplica entrega una lectura anterior: esperar a que termine
+                return 'ocupado', chat_state
+            self._write_json(self._chat_file(chat_id), dict(
+                chat_state, seq=seq, en_curso=True, claimed_at=time.time(), claimed_by=os.getpid()
+            ))
+            return 'reclamada', chat_state
+        finally:
+            self.unlock(lock)
+
+    def finish_chat(self, chat_id, chat_state: dict):
+        """Guarda el estado del chat tras la entrega (bloqueante: usar desde un hilo)"""
+        with self.locked(self._chat_lock_file(chat_id)):
+            self._write_json(self._chat_file(chat_id), dict(chat_state, en_curso=False))
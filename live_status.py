@@ -0,0 +1,143 @@
+"""
+Mensaje de estado UV "en directo" fijado en cada chat.
+
+En lugar de enviar un mensaje nuevo en cada actualización, se mantiene un
+único mensaje fijado por chat y se edita con edit_message_text solo cuando
+el texto renderizado cambia. Las ediciones se limitan a una por intervalo:
+las que llegan antes se agrupan y se aplica solo la última. El id del
+mensaje se persiste para seguir editando el mismo tras un reinicio (y entre
+réplicas en modo HA, con un fichero por chat y temporales por proceso).
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+from telegram.error import BadRequest, RetryAfter, TelegramError
+
+from tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+
+class LiveStatusMessage:
+    """Mensaje fijado de un chat, editado solo si cambia su contenido"""
+
+    def __init__(self, chat_id, path: str, min_edit_seconds: float = 60):
+        self.chat_id = str(chat_id)
+        self.path = path
+        self.min_edit_seconds = min_edit_seconds
+        self.message_id = None
+        self.text = None
+        self.edited_at = 0.0
+        self.pending_text = None
+        self._flush_task = None
+        # /status y el ciclo de chequeo pueden publicar a la vez: un solo envío en vuelo
+        self._lock = asyncio.Lock()
+
+    def _load(self):
+        """Relee el estado del chat: otra réplica puede haber editado el mensaje"""
+        try:
+            if Path(self.path).exists():
+                with open(self.path, 'r') as f:
+                    state = json.load(f).get(self.chat_id, {})
+                self.message_id = state.get('message_id', self.message_id)
+                self.text = state.get('text', self.text)
+                self.edited_at = state.get('edited_at', self.edited_at)
+        except Exception as e:
+            logger.error(f"Error cargando estado del mensaje fijado: {e}")
+
+    def _save(self):
+        try:
+            path = Path(self.path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            chats = {}
+            if path.exists():
+                with open(path, 'r') as f:
+                    chats = json.load(f)
+            chats[self.chat_id] = {
+                'message_id': self.message_id,
+                'text': self.text,
+                'edited_at': self.edited_at,
+            }
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            with open(tmp, 'w') as f:
+                json.dump(chats, f, indent=2, ensure_ascii=False)
+            os.replace(tmp, path)
+        except Exception as e:
+            logger.error(f"Error guardando estado del mensaje fijado: {e}")
+
+    async def update(self, bot, text: str) -> bool:
+        """Publica `text` si difiere del actual. Devuelve True si se envió o editó ya"""
+        self._load()
+        if text == self.text:
+            self.pending_text = None
+            return False
+
+        wait = self.edited_at + self.min_edit_seconds - time.time()
+        if self.message_id is not None and wait > 0:
+            # Demasiado pronto: se aplicará la última versión al vencer el intervalo
+            self.pending_text = text
+            if self._flush_task is None or self._flush_task.done():
+                self._flush_task = asyncio.create_task(self._flush_later(bot, wait))
+            return False
+
+        return await self._publish(bot, text)
+
+    async def _flush_later(self, bot, wait: float):
+        await asyncio.sleep(wait)
+        text, self.pending_text = self.pending_text, None
+        if text is not None and text != self.text:
+            await self._publish(bot, text)
+
+    async def _publish(self, bot, text: str) -> bool:
+        async with self._lock:
+            return await self._publish_locked(bot, text)
+
+    async def _publish_locked(self, bot, text: str) -> bool:
+        try:
+            with tracer.span('editar_estado', chat_id=self.chat_id, nuevo=self.message_id is None):
+                if self.message_id is not None:
+                    try:
+                        await bot.edit_message_text(
+                            chat_id=self.chat_id, message_id=self.message_id,
+                            text=text, parse_mode='HTML'
+                        )
+                    except BadRequest as e:
+                        # "message is not modified" no es un error: el contenido ya está publicado
+                        if 'not modified' not in str(e).lower():
+                            # Mensaje borrado o demasiado antiguo: crear uno nuevo
+                            logger.warning(f"No se pudo editar el mensaje fijado ({e}), creando otro")
+                            self.message_id = None
+
+                if self.message_id is None:
+                    message = await bot.send_message(chat_id=self.chat_id, text=text,
+                                                     parse_mode='HTML', disable_notification=True)
+                    self.message_id = message.message_id
+                    try:
+                        await bot.pin_chat_message(chat_id=self.chat_id, message_id=self.message_id,
+                                                   disable_notification=True)
+                    except TelegramError as e:
+                        logger.warning(f"No se pudo fijar el mensaje de estado: {e}")
+
+            tracer.record_delivery()
+            self.text = text
+            self.edited_at = time.time()
+            self._save()
+            return True
+
+        except RetryAfter as e:
+            # Telegram pide esperar: reintentar con la última versión
+            logger.warning(f"Límite de Telegram al editar el estado, reintento en {e.retry_after}s")
+            self.pending_text = text
+            self._flush_task = asyncio.create_task(self._flush_later(bot, float(e.retry_after)))
+        except TelegramError as e:
+            logger.error(f"Error actualizando el mensaje fijado: {e}")
+        return False
+
+    def cancel(self):
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
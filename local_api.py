@@ -0,0 +1,204 @@
+"""
+API local HTTP + Server-Sent Events con la lectura UV en directo.
+
+Servidor asyncio sin dependencias externas:
+
+    GET /api/actual     lectura actual, proveedor y estado de alerta
+    GET /api/prevision  previsión de las próximas horas
+    GET /api/historial  lecturas de hoy y agregados diarios importados
+    GET /api/eventos    stream SSE con cada lectura nueva y cambio de alerta
+    GET /api/trazas     SLO de latencia datos del proveedor → entrega en Telegram
+
+Publicar un evento es O(1): se serializa una sola vez en un buffer circular
+compartido y se despierta a los clientes. Cada cliente lleva su propio
+cursor; si un cliente lento se queda atrás del buffer, salta al último
+estado en lugar de acumular memoria, y si su socket no drena a tiempo se
+desconecta.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import deque
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Segundos entre comentarios de keep-alive en SSE
+HEARTBEAT_SECONDS = 15
+# Tiempo máximo para que un cliente drene su socket antes de desconectarlo
+DRAIN_TIMEOUT_SECONDS = 5
+
+
+class EventHub:
+    """Buffer circular de eventos SSE ya serializados"""
+
+    def __init__(self, max_events: int = 64):
+        self.events = deque(maxlen=max_events)
+        self.seq = 0
+        self._wakeup = None
+
+    def publish(self, event_type: str, data: dict):
+        """Añade un evento y despierta a los clientes (sin trabajo por cliente)"""
+        self.seq += 1
+        payload = json.dumps(data, ensure_ascii=False)
+        encoded = f"id: {self.seq}\nevent: {event_type}\ndata: {payload}\n\n".encode('utf-8')
+        self.events.append((self.seq, encoded))
+
+        if self._wakeup is not None:
+            wakeup, self._wakeup = self._wakeup, None
+            wakeup.set()
+
+    async def wait_after(self, seq: int, timeout: float) -> bool:
+        """Espera a que haya eventos posteriores a `seq`. False si vence el timeout"""
+        if self.seq > seq:
+            return True
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def since(self, seq: int):
+        """Eventos posteriores a `seq` y si el cliente se ha quedado atrás del buffer"""
+        if not self.events:
+            return [], False
+        oldest = self.events[0][0]
+        lagged = seq + 1 < oldest
+        return [encoded for event_seq, encoded in self.events if event_seq > seq], lagged
+
+
+class LocalAPIServer:
+    """Servidor HTTP/SSE sobre el estado de un UVMonitor"""
+
+    def __init__(self, monitor, host: str = '127.0.0.1', port: int = 8080):
+        self.monitor = monitor
+        self.host = host
+        self.port = port
+        self.server = None
+        self.clients = 0
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        logger.info(f"API local escuchando en http://{self.host}:{self.port}")
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+    async def handle_connection(self, reader, writer):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), 10)
+            # Ignorar cabeceras: solo se atienden GET sin cuerpo
+            while True:
+                line = await asyncio.wait_for(reader.readline(), 10)
+                if line in (b'\r\n', b'\n', b''):
+                    break
+
+            parts = request_line.decode('latin-1').split()
+            if len(parts) < 2 or parts[0] != 'GET':
+                await self.send_json(writer, {'error': 'Método no permitido'}, status='405 Method Not Allowed')
+                return
+
+            url = urlsplit(parts[1])
+            query = parse_qs(url.query)
+
+            if url.path == '/api/eventos':
+                await self.stream_events(writer)
+            elif url.path == '/api/actual':
+                await self.send_json(writer, self.monitor.current_reading_payload())
+            elif url.path == '/api/prevision':
+                await self.send_json(writer, self.forecast_payload())
+            elif url.path == '/api/historial':
+                try:
+                    days = int(query.get('dias', ['7'])[0])
+                except ValueError:
+                    await self.send_json(writer, {'error': 'dias debe ser un entero'}, status='400 Bad Request')
+                    return
+                await self.send_json(writer, self.history_payload(max(1, days)))
+            elif url.path == '/api/trazas':
+                await self.send_json(writer, tracer.slo_summary())
+            else:
+                await self.send_json(writer, {'error': 'No encontrado'}, status='404 Not Found')
+
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        except Exception as e:
+            logger.error(f"Error en API local: {e}")
+        finally:
+            writer.close()
+
+    async def send_json(self, writer, data, status='200 OK'):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode('latin-1') + body
+        )
+        await writer.drain()
+
+    async def stream_events(self, writer):
+        """Mantiene un stream SSE; empieza con el estado actual"""
+        hub = self.monitor.event_hub
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                     b"Cache-Control: no-cache\r\nConnection: keep-alive\r\n\r\n")
+        self.write_current_state(writer, hub.seq)
+        cursor = hub.seq
+
+        self.clients += 1
+        try:
+            while True:
+                await asyncio.wait_for(writer.drain(), DRAIN_TIMEOUT_SECONDS)
+
+                if not await hub.wait_after(cursor, HEARTBEAT_SECONDS):
+                    writer.write(b": keep-alive\n\n")
+                    continue
+
+                events, lagged = hub.since(cursor)
+                cursor = hub.seq
+                if lagged:
+                    # Cliente lento: descartar lo perdido y enviar el estado actual
+                    self.write_current_state(writer, cursor)
+                else:
+                    writer.write(b''.join(events))
+        except asyncio.TimeoutError:
+            logger.warning("Cliente SSE desconectado por no consumir eventos a tiempo")
+        finally:
+            self.clients -= 1
+
+    def write_current_state(self, writer, seq):
+        payload = json.dumps(self.monitor.current_reading_payload(), ensure_ascii=False)
+        writer.write(f"id: {seq}\nevent: estado\ndata: {payload}\n\n".encode('utf-8'))
+
+    def forecast_payload(self) -> dict:
+        now = time.time()
+        return {
+            'prevision': [{'epoch': epoch, 'uv': uv}
+                          for epoch, uv in self.monitor.current_forecast if epoch >= now - 3600],
+            'proveedor': self.monitor.current_provider,
+        }
+
+    def history_payload(self, days: int) -> dict:
+        """Lecturas de hoy y últimos días del histórico importado"""
+        daily = {}
+        history_file = os.getenv('UV_HISTORY_FILE', '/app/logs/uv_daily_history.json')
+        try:
+            if Path(history_file).exists():
+                with open(history_file, 'r') as f:
+                    history = json.load(f)
+                daily = {key: history[key] for key in sorted(history)[-days:]}
+        except Exception as e:
+            logger.error(f"Error leyendo histórico diario: {e}")
+
+        return {
+            'hoy': [{'epoch': epoch, 'uv': uv} for epoch, uv in self.monitor.today_readings],
+            'diario': daily,
+        }
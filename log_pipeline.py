@@ -0,0 +1,175 @@
+"""
+Pipeline de logging no bloqueante para despliegues en tarjeta SD.
+
+El event loop solo encola registros (QueueHandler); un hilo en segundo plano
+(QueueListener) escribe a consola y a fichero con rotación por tamaño y por
+tiempo, comprimiendo los ficheros rotados con gzip. Opcionalmente escribe
+líneas JSON y muestrea mensajes repetitivos para no desgastar la tarjeta.
+"""
+
+import atexit
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+from pathlib import Path
+
+_NUMBER_RE = re.compile(r'\d+(?:[.,]\d+)?')
+
+
+class SizeAndTimeRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Rota al superar max_bytes o al pasar rotate_hours, y comprime con gzip"""
+
+    def __init__(self, filename, max_bytes=5 * 1024 * 1024, backup_count=5,
+                 rotate_hours=24, compress=True):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count,
+                         encoding='utf-8', delay=True)
+        self.rotate_seconds = rotate_hours * 3600
+        self.rollover_at = self._next_rollover()
+        if compress:
+            self.namer = lambda name: f"{name}.gz"
+            self.rotator = self._gzip_rotator
+
+    def _next_rollover(self):
+        return time.time() + self.rotate_seconds if self.rotate_seconds > 0 else float('inf')
+
+    @staticmethod
+    def _gzip_rotator(source, dest):
+        with open(source, 'rb') as src, gzip.open(dest, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(source)
+
+    def shouldRollover(self, record):
+        if time.time() >= self.rollover_at:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        # Evitar rotar ficheros vacíos (p. ej. rotación por tiempo sin actividad)
+        if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename) > 0:
+            super().doRollover()
+        self.rollover_at = self._next_rollover()
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Formatea cada registro como una línea JSON"""
+
+    def format(self, record):
+        entry = {
+            'ts': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'logger': record.name,
+            'level': record.levelname,
+            'msg': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class RateLimitFilter(logging.Filter):
+    """Deja pasar como máximo `burst` mensajes similares por ventana de tiempo.
+
+    Los mensajes se agrupan por logger, nivel y texto con los números
+    normalizados. Al abrirse una ventana nueva, el primer mensaje indica
+    cuántos similares se suprimieron en la anterior.
+    """
+
+    def __init__(self, window_seconds=60, burst=5):
+        super().__init__()
+        self.window_seconds = window_seconds
+        self.burst = burst
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if self.window_seconds <= 0:
+            return True
+
+        key = (record.name, record.levelno, _NUMBER_RE.sub('#', str(record.msg)))
+        now = time.monotonic()
+
+        with self._lock:
+            window_start, count, suppressed = self._buckets.get(key, (now, 0, 0))
+            if now - window_start >= self.window_seconds:
+                if suppressed:
+                    record.msg = f"{record.msg} ({suppressed} mensajes similares suprimidos)"
+                window_start, count, suppressed = now, 0, 0
+
+            count += 1
+            allowed = count <= self.burst
+            if not allowed:
+                suppressed += 1
+            self._buckets[key] = (window_start, count, suppressed)
+
+            # Evitar que el diccionario crezca sin límite con mensajes únicos
+            if len(self._buckets) > 1000:
+                self._buckets = {k: v for k, v in self._buckets.items()
+                                 if now - v[0] < self.window_seconds}
+
+        return allowed
+
+
+def setup_logging(log_file='/app/logs/uv_monitor.log', level=logging.INFO,
+                  max_bytes=5 * 1024 * 1024, backup_count=5, rotate_hours=24,
+                  compress=True, json_lines=False, sample_window_seconds=60,
+                  sample_burst=5):
+    """Configura el logging raíz con cola y escritor en segundo plano.
+
+    Devuelve el QueueListener (ya arrancado); se detiene al salir del proceso.
+    """
+    text_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    console = logging.StreamHandler()
+    console.setFormatter(text_formatter)
+    handlers = [console]
+
+    if log_file:
+        Path(log_file).parent.mkdir(parents=True, exist_ok=True)
+        file_handler = SizeAndTimeRotatingFileHandler(
+            log_file, max_bytes=max_bytes, backup_count=backup_count,
+            rotate_hours=rotate_hours, compress=compress
+        )
+        file_handler.setFormatter(JsonLinesFormatter() if json_lines else text_formatter)
+        handlers.append(file_handler)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter(sample_window_seconds, sample_burst))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(_stop_listener, listener)
+    return listener
+
+
+def _stop_listener(listener):
+    """Vacía la cola y detiene el hilo escritor (tolera paradas repetidas)"""
+    if getattr(listener, '_thread', None) is not None:
+        listener.stop()
+
+
+def setup_logging_from_env():
+    """Configura el pipeline de logging a partir de variables de entorno"""
+    return setup_logging(
+        log_file=os.getenv('LOG_FILE', '/app/logs/uv_monitor.log'),
+        level=getattr(logging, os.getenv('LOG_LEVEL', 'INFO').upper(), logging.INFO),
+        max_bytes=int(float(os.getenv('LOG_MAX_MB', '5')) * 1024 * 1024),
+        backup_count=int(os.getenv('LOG_BACKUP_COUNT', '5')),
+        rotate_hours=float(os.getenv('LOG_ROTATE_HOURS', '24')),
+        compress=os.getenv('LOG_COMPRESS', 'true').lower() == 'true',
+        json_lines=os.getenv('LOG_JSON', 'false').lower() == 'true',
+        sample_window_seconds=float(os.getenv('LOG_SAMPLE_WINDOW_SECONDS', '60')),
+        sample_burst=int(os.getenv('LOG_SAMPLE_BURST', '5')),
+    )
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Ejecuta varios bots de Telegram en un único proceso.
+
+Cada bot (token, chat, umbral, tipo de piel, ficheros de estado) tiene su
+propio UVMonitor con sus comandos, suscriptores y estado, pero todos
+comparten un único cliente de APIs UV, un único planificador y el pool de
+render de gráficas: una consulta a la API por ciclo, con independencia del
+número de bots.
+
+Configuración (MULTI_BOT_CONFIG, por defecto /app/config/bots.json):
+
+    {
+      "check_interval_minutes": 30,
+      "bots": [
+        {"name": "tienda-centro", "telegram_bot_token": "...", "telegram_chat_id": "...",
+         "uv_threshold": 6, "skin_type": 2, "state_dir": "/app/logs/tienda-centro"},
+        {"name": "tienda-norte", "telegram_bot_token": "...", "telegram_chat_id": "...",
+         "state_dir": "/app/logs/tienda-norte"}
+      ]
+    }
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+
+from log_pipeline import setup_logging_from_env
+from openweather_api import CurrentUVIndexAPI
+from tracing import tracer
+from uv_chart import create_render_pool
+from uv_monitor import UVMonitor
+
+logger = logging.getLogger(__name__)
+
+
+class MultiBotRunner:
+    """Aloja N bots que comparten la ruta de consulta a las APIs y el planificador"""
+
+    def __init__(self, config: dict):
+        bots = config.get('bots', [])
+        if not bots:
+            raise ValueError("La configuración no define ningún bot")
+
+        self.check_interval = int(config.get('check_interval_minutes',
+                                             os.getenv('CHECK_INTERVAL_MINUTES', '30')))
+
+        # Recursos compartidos
+        self.uv_api = CurrentUVIndexAPI()
+        self.chart_pool = None
+
+        self.monitors = []
+        for index, bot_config in enumerate(bots):
+            bot_config = dict(bot_config)
+            bot_config.setdefault('name', f"bot-{index + 1}")
+            bot_config.setdefault('state_dir', f"/app/logs/{bot_config['name']}")
+            bot_config['check_interval_minutes'] = self.check_interval
+            self.monitors.append(UVMonitor(bot_config, uv_api=self.uv_api))
+
+        self.next_check_at = 0
+
+    @classmethod
+    def from_file(cls, path: str) -> 'MultiBotRunner':
+        with open(path, 'r') as f:
+            return cls(json.load(f))
+
+    async def check_all(self):
+        """Una consulta a la API y reparto de la lectura a todos los bots"""
+        self.next_check_at = time.time() + self.check_interval * 60
+
+        with tracer.trace('ciclo_uv', bots=len(self.monitors)) as trace:
+            with tracer.span('consulta_proveedor'):
+                uv_index = self.uv_api.get_current_uv()
+            if uv_index is None:
+                logger.warning("No se pudieron obtener datos UV")
+                return
+            logger.info(f"Índice UV obtenido: {uv_index} - repartiendo a {len(self.monitors)} bots")
+            tracer.set_data_time(self.uv_api.last_data_time)
+
+            for monitor in self.monitors:
+                monitor.adopt_reading_source()
+                monitor.next_check_at = self.next_check_at
+
+            # Las alertas de cada bot son independientes: enviarlas en paralelo
+            await asyncio.gather(*(monitor.process_uv_reading(uv_index) for monitor in self.monitors))
+
+        self.monitors[0].log_trace_latency(trace)
+
+    async def scheduler(self):
+        """Planificador único para todos los bots"""
+        reference = self.monitors[0]
+        while True:
+            try:
+                for monitor in self.monitors:
+                    monitor.reset_daily_sunscreen_data()
+
+                if reference.should_check_uv():
+                    wait = self.next_check_at - time.time()
+                    if wait > 0:
+                        await asyncio.sleep(min(wait, self.check_interval * 60))
+                        continue
+                    await self.check_all()
+                    logger.info(f"Chequeo UV completado - Próximo en {self.check_interval} minutos")
+                else:
+                    now = datetime.now(reference.tz)
+                    logger.info(f"Fuera de horas UV ({now.hour}h) - Próximo chequeo en 1 hora")
+                    await asyncio.sleep(3600)
+
+            except Exception as e:
+                logger.error(f"Error en verificación UV multi-bot: {e}")
+                await asyncio.sleep(60)
+
+    async def run_async(self):
+        try:
+            for monitor in self.monitors:
+                await monitor.setup_telegram_bot()
+                await monitor.start_bot_polling()
+                monitor.restore_checkpoint()
+                # Un único pool de render para todos los bots
+                if self.chart_pool is None:
+                    self.chart_pool = create_render_pool()
+                monitor.chart_pool = self.chart_pool
+                # API local solo para los bots que declaren su propio puerto
+                if 'local_api_port' in monitor.config:
+                    await monitor.start_local_api()
+
+            # Reanudar con el plazo más próximo de los checkpoints restaurados
+            self.next_check_at = min(monitor.next_check_at for monitor in self.monitors)
+            if time.time() >= self.next_check_at:
+                await self.check_all()
+
+            await self.scheduler()
+
+        except KeyboardInterrupt:
+            logger.info("Deteniendo bots...")
+        except Exception as e:
+            logger.error(f"Error en multi-bot: {e}")
+        finally:
+            for monitor in self.monitors:
+                await monitor.stop_bot_polling()
+                if monitor.local_api:
+                    await monitor.local_api.stop()
+                monitor.save_checkpoint()
+                monitor.snapshot.close()
+                if monitor.live_status:
+                    monitor.live_status.cancel()
+            if self.chart_pool:
+                self.chart_pool.shutdown(wait=False)
+
+    def run(self):
+        names = ', '.join(monitor.name for monitor in self.monitors)
+        logger.info(f"Iniciando {len(self.monitors)} bots en un proceso: {names}")
+        logger.info(f"Intervalo de chequeo compartido: {self.check_interval} minutos")
+        asyncio.run(self.run_async())
+
+
+def main():
+    setup_logging_from_env()
+    config_path = sys.argv[1] if len(sys.argv) > 1 else os.getenv('MULTI_BOT_CONFIG', '/app/config/bots.json')
+    if not os.path.exists(config_path):
+        logger.error(f"No existe el fichero de configuración multi-bot: {config_path}")
+        sys.exit(1)
+
+    MultiBotRunner.from_file(config_path).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,26 @@
 import requests
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import logging
 import os
+import time
+import pytz
+from reading_filter import ProviderReading, ReadingFilter
+from request_budget import RequestBudget, expected_clear_sky_uv
+from tracing import tracer
 
 logger = logging.getLogger(__name__)
 
 
 class CurrentUVIndexAPI:
-    """Cliente para la API de CurrentUVIndex.com con respaldo OpenUV - datos UV en tiempo real"""
+    """Cliente para la API de CurrentUVIndex.com fusionada con OpenUV - datos UV en tiempo real"""
     
     def __init__(self):
         # Base URL para CurrentUVIndex (sin API key necesaria)
         self.base_url = "https://currentuvindex.com/api/v1/uvi"
         
-        # OpenUV API como respaldo (requiere API key gratuita)
+        # OpenUV API como segunda fuente (requiere API key gratuita)
         self.openuv_base_url = "https://api.openuv.io/api/v1/uv"
         self.openuv_api_key = os.getenv('OPENUV_API_KEY')
         
@@ -21,23 +28,108 @@ class CurrentUVIndexAPI:
         self.vitoria_lat = 42.8466
         self.vitoria_lon = -2.6725
         
-        logger.info("Usando CurrentUVIndex API (principal) y OpenUV API (respaldo) para datos UV")
+        # Presupuesto de cuota diaria para proveedores limitados (OpenUV free: 50/día)
+        self.budget = RequestBudget(
+            os.getenv('REQUEST_BUDGET_FILE', '/app/logs/request_budget.json'),
+            quotas={'openuv': int(os.getenv('OPENUV_DAILY_QUOTA', '50'))},
+            lat=self.vitoria_lat,
+            lon=self.vitoria_lon,
+            tz=pytz.timezone('Europe/Madrid')
+        )
+        
+        # Filtro de picos y fusión de proveedores entre la consulta y las alertas
+        self.reading_filter = ReadingFilter(
+            window=int(os.getenv('FILTER_WINDOW', '7')),
+            threshold_sigmas=float(os.getenv('FILTER_THRESHOLD_SIGMAS', '3'))
+        )
+        # Los dos proveedores se consultan a la vez
+        self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='uv-api')
+        
+        # Metadatos de la última lectura: proveedor, hora de los datos, previsión y confianza
+        self.last_provider = None
+        self.last_data_time = None
+        self.last_forecast = []
+        self.last_confidence = None
+        
+        logger.info("Usando CurrentUVIndex API y OpenUV API (fusionadas) para datos UV")
     
     def get_current_uv(self):
-        """Obtiene el índice UV actual para Vitoria-Gasteiz en tiempo real"""
-        # Intentar primero CurrentUVIndex
-        uv_value = self._try_currentuvindex()
-        if uv_value is not None:
-            return uv_value
-            
-        # Si falla, intentar OpenUV
-        uv_value = self._try_openuv()
-        if uv_value is not None:
-            return uv_value
-            
+        """Obtiene el índice UV actual para Vitoria-Gasteiz: consulta, filtra y fusiona"""
+        readings = self._fetch_providers()
+        
         # Si ambas fallan, usar estimación
-        logger.warning("Todas las APIs UV fallaron, usando estimación por tiempo")
-        return self._estimate_uv_by_time()
+        if not readings:
+            logger.warning("Todas las APIs UV fallaron, usando estimación por tiempo")
+            readings = [ProviderReading('estimacion', self._estimate_uv_by_time(), time.time())]
+        
+        expected_uv = expected_clear_sky_uv(datetime.now(self.budget.tz), self.vitoria_lat, self.vitoria_lon)
+        with tracer.span('filtro_lecturas', entradas=len(readings)) as span:
+            fused = self.reading_filter.process(readings, expected_uv=expected_uv)
+            if span is not None and fused is not None:
+                span['attributes'].update(uv=fused.uv, confianza=fused.confidence, descartadas=fused.rejected)
+        
+        if fused is None:
+            logger.warning("Todas las lecturas UV descartadas por atípicas en este ciclo")
+            return None
+        
+        forecast = next((r.forecast for r in readings if r.forecast and r.provider in fused.providers), [])
+        self._record_source('+'.join(fused.providers), fused.data_time, forecast)
+        self.last_confidence = fused.confidence
+        
+        if len(fused.providers) > 1:
+            logger.info(f"UV fusionado: {fused.uv} (confianza {fused.confidence}) de "
+                        + ', '.join(f"{r.provider}={r.uv}" for r in readings))
+        return fused.uv
+    
+    def _fetch_providers(self):
+        """Consulta CurrentUVIndex y OpenUV en paralelo; devuelve las lecturas válidas"""
+        providers = (
+            ('currentuvindex', self._try_currentuvindex),
+            ('openuv', self._try_openuv),
+        )
+        # Cada hilo hereda el contexto para que sus spans cuelguen de la traza del ciclo
+        futures = [
+            (name, self.executor.submit(contextvars.copy_context().run, self._traced_fetch, name, fetch))
+            for name, fetch in providers
+        ]
+        readings = []
+        for name, future in futures:
+            try:
+                reading = future.result()
+            except Exception as e:
+                logger.error(f"Error consultando {name}: {e}")
+                continue
+            if reading is not None:
+                readings.append(reading)
+        return readings
+    
+    @staticmethod
+    def _traced_fetch(name, fetch):
+        with tracer.span(f'proveedor.{name}') as span:
+            reading = fetch()
+            if span is not None:
+                span['attributes']['ok'] = reading is not None
+        return reading
+    
+    def _record_source(self, provider, data_time, forecast):
+        """Guarda proveedor, hora de los datos (epoch) y previsión [(epoch, uv)]"""
+        self.last_provider = provider
+        self.last_data_time = data_time
+        self.last_forecast = []
+        for item in forecast or []:
+            epoch = self._parse_api_time(item.get('time'))
+            if epoch is not None and 'uvi' in item:
+                self.last_forecast.append((epoch, float(item['uvi'])))
+    
+    @staticmethod
+    def _parse_api_time(api_time_str):
+        """Convierte una fecha ISO de la API a epoch, o None"""
+        if not api_time_str:
+            return None
+        try:
+            return datetime.fromisoformat(api_time_str.replace('Z', '+00:00')).timestamp()
+        except (ValueError, AttributeError):
+            return None
     
     def _try_currentuvindex(self):
         """Intenta obtener datos UV de CurrentUVIndex.com"""
@@ -67,12 +159,17 @@ class CurrentUVIndexAPI:
             api_time = now_data.get('time', '')
             
             # Verificar si los datos están desactualizados (más de 75 minutos)
-            if self._is_data_stale(api_time):
+            with tracer.span('comprobacion_antiguedad', api_time=api_time) as span:
+                stale = self._is_data_stale(api_time)
+                if span is not None:
+                    span['attributes']['desactualizado'] = stale
+            if stale:
                 logger.warning(f"CurrentUVIndex datos desactualizados: {api_time}")
                 return None
                 
             logger.info(f"UV obtenido de CurrentUVIndex: {uv_value} (fecha: {api_time})")
-            return float(uv_value)
+            return ProviderReading('currentuvindex', float(uv_value), self._parse_api_time(api_time),
+                                   forecast=data.get('forecast', []))
                 
         except requests.exceptions.RequestException as e:
             logger.error(f"Error conectando con CurrentUVIndex API: {e}")
@@ -86,6 +183,9 @@ class CurrentUVIndexAPI:
         if not self.openuv_api_key:
             logger.warning("OpenUV API key no configurada")
             return None
+        
+        if not self.budget.allow('openuv'):
+            return None
             
         try:
             headers = {'x-access-token': self.openuv_api_key}
@@ -94,6 +194,8 @@ class CurrentUVIndexAPI:
                 'lng': self.vitoria_lon
             }
             
+            # La cuota cuenta cada petición realizada, aunque falle
+            self.budget.record_call('openuv')
             response = requests.get(self.openuv_base_url, headers=headers, params=params, timeout=15)
             response.raise_for_status()
             
@@ -113,7 +215,7 @@ class CurrentUVIndexAPI:
             api_time = result.get('uv_time', '')
             
             logger.info(f"UV obtenido de OpenUV: {uv_value} (fecha: {api_time})")
-            return float(uv_value)
+            return ProviderReading('openuv', float(uv_value), self._parse_api_time(api_time))
                 
         except requests.exceptions.RequestException as e:
             logger.error(f"Error conectando con OpenUV API: {e}")
@@ -0,0 +1,171 @@
+"""
+Filtro en streaming de lecturas UV y fusión de varios proveedores.
+
+Cada proveedor tiene una ventana corta de lecturas aceptadas sobre la que se
+aplica un filtro de Hampel (mediana y MAD, coste constante por lectura):
+los picos aislados se rechazan, igual que los ceros cuando el UV esperado
+con cielo despejado es claramente positivo. Un valor atípico se acepta si
+persiste (segunda lectura seguida desviada en el mismo sentido) o si otro
+proveedor o el UV esperado lo respaldan: un cambio real de nivel o la
+subida de la mañana no se bloquean. Las lecturas supervivientes se
+fusionan con pesos según la frescura de los datos y el error histórico de
+cada proveedor frente al valor fusionado. Cada resultado lleva una
+confianza entre 0 y 1 que el monitor usa para retener alertas dudosas.
+"""
+
+import logging
+import math
+import statistics
+import time
+from collections import deque
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Escala de la MAD para aproximar la desviación típica
+_MAD_SCALE = 1.4826
+
+
+class ProviderReading:
+    """Lectura de un proveedor con la hora (epoch) de sus datos y su previsión cruda"""
+
+    def __init__(self, provider: str, uv: float, data_time: Optional[float] = None, forecast=None):
+        self.provider = provider
+        self.uv = uv
+        self.data_time = data_time
+        self.forecast = forecast or []
+
+
+class FusedReading:
+    """Resultado del filtro: valor fusionado, confianza y lecturas usadas"""
+
+    def __init__(self, uv: float, confidence: float, providers: List[str],
+                 data_time: Optional[float], rejected: List[str]):
+        self.uv = uv
+        self.confidence = confidence
+        self.providers = providers
+        self.data_time = data_time
+        self.rejected = rejected
+
+
+class ReadingFilter:
+    """Rechazo de picos (Hampel) por proveedor y fusión ponderada"""
+
+    def __init__(self, window: int = 7, threshold_sigmas: float = 3.0, min_deviation: float = 1.5,
+                 freshness_minutes: float = 30.0, grace_minutes: float = 60.0,
+                 estimate_confidence: float = 0.3):
+        self.window = window
+        self.threshold_sigmas = threshold_sigmas
+        self.min_deviation = min_deviation
+        self.freshness_minutes = freshness_minutes
+        # Los proveedores publican cada hora: hasta entonces el dato no pierde confianza
+        self.grace_minutes = grace_minutes
+        self.estimate_confidence = estimate_confidence
+        self.history = {}
+        # Sentido (+1/-1) de la última desviación atípica de cada proveedor
+        self.suspect = {}
+        # Error cuadrático medio (media exponencial) de cada proveedor frente a la fusión
+        self.error_variance = {}
+
+    def is_impossible(self, reading: ProviderReading, expected_uv: Optional[float] = None) -> bool:
+        """Valores que nunca se aceptan, aunque se repitan"""
+        if reading.uv < 0:
+            return True
+        # Cero "pegado" cuando el sol está alto: dato caducado o sensor caído
+        return reading.uv == 0 and expected_uv is not None and expected_uv >= 3
+
+    def deviation(self, reading: ProviderReading) -> int:
+        """Hampel sobre la ventana del proveedor: +1/-1 si la lectura es atípica, 0 si no"""
+        window = self.history.get(reading.provider)
+        if not window or len(window) < 3:
+            return 0
+
+        median = statistics.median(window)
+        mad = statistics.median(abs(value - median) for value in window) * _MAD_SCALE
+        if abs(reading.uv - median) <= max(self.threshold_sigmas * mad, self.min_deviation):
+            return 0
+        return 1 if reading.uv > median else -1
+
+    def _confirmed(self, reading: ProviderReading, direction: int, others: List[ProviderReading],
+                   expected_uv: Optional[float]) -> bool:
+        """Un valor atípico se acepta si persiste o si otra fuente lo respalda"""
+        if self.suspect.get(reading.provider) == direction:
+            return True
+        if any(abs(other.uv - reading.uv) <= self.min_deviation for other in others):
+            return True
+        return expected_uv is not None and abs(reading.uv - expected_uv) <= self.min_deviation
+
+    def _accept(self, reading: ProviderReading):
+        window = self.history.setdefault(reading.provider, deque(maxlen=self.window))
+        window.append(reading.uv)
+
+    def _freshness(self, reading: ProviderReading, now: float, grace_minutes: float = 0.0) -> float:
+        """Decae exponencialmente con la antigüedad de los datos a partir de `grace_minutes`"""
+        if reading.data_time is None:
+            return 0.5
+        age_minutes = max(0.0, (now - reading.data_time) / 60 - grace_minutes)
+        return math.exp(-age_minutes / self.freshness_minutes)
+
+    def _reliability(self, provider: str) -> float:
+        return 1.0 / (1.0 + self.error_variance.get(provider, 0.0))
+
+    def process(self, readings: List[ProviderReading], expected_uv: Optional[float] = None,
+                now: Optional[float] = None) -> Optional[FusedReading]:
+        """Filtra y fusiona las lecturas de un ciclo. None si no queda ninguna"""
+        now = now or time.time()
+        accepted, rejected = [], []
+
+        valid = [r for r in readings if not self.is_impossible(r, expected_uv)]
+        for reading in readings:
+            if reading not in valid:
+                rejected.append(reading.provider)
+                logger.warning(f"Lectura descartada por imposible: {reading.provider} = {reading.uv}")
+                continue
+
+            direction = self.deviation(reading)
+            if direction == 0:
+                self.suspect.pop(reading.provider, None)
+                accepted.append(reading)
+            else:
+                others = [r for r in valid if r is not reading]
+                if self._confirmed(reading, direction, others, expected_uv):
+                    accepted.append(reading)
+                    logger.info(f"Cambio brusco confirmado: {reading.provider} = {reading.uv}")
+                else:
+                    rejected.append(reading.provider)
+                    logger.warning(f"Lectura descartada por atípica: {reading.provider} = {reading.uv}")
+                self.suspect[reading.provider] = direction
+            # Los atípicos también entran en la ventana: si el nivel cambia de verdad,
+            # la mediana lo alcanza en pocas lecturas
+            self._accept(reading)
+
+        if not accepted:
+            return None
+
+        weights = [self._freshness(r, now) * self._reliability(r.provider) for r in accepted]
+
+        total = sum(weights) or 1.0
+        fused = sum(w * r.uv for w, r in zip(weights, accepted)) / total
+
+        # Actualizar el error histórico de cada proveedor frente a la fusión
+        if len(accepted) > 1:
+            for reading in accepted:
+                previous = self.error_variance.get(reading.provider, 0.0)
+                self.error_variance[reading.provider] = 0.8 * previous + 0.2 * (reading.uv - fused) ** 2
+
+        confidence = self._confidence(accepted, rejected, now)
+        data_time = max((r.data_time for r in accepted if r.data_time), default=None)
+        return FusedReading(round(fused, 1), confidence, [r.provider for r in accepted], data_time, rejected)
+
+    def _confidence(self, accepted, rejected, now) -> float:
+        if all(r.provider == 'estimacion' for r in accepted):
+            return self.estimate_confidence
+
+        # Frescura/fiabilidad media, acuerdo entre proveedores y penalización por rechazos
+        quality = sum(self._freshness(r, now, self.grace_minutes) * self._reliability(r.provider)
+                      for r in accepted) / len(accepted)
+        spread = max(r.uv for r in accepted) - min(r.uv for r in accepted)
+        agreement = 1.0 / (1.0 + spread / 2)
+        corroboration = 1.0 if len(accepted) > 1 else 0.85
+        penalty = 0.7 ** len(rejected)
+        return round(max(0.0, min(1.0, quality * agreement * corroboration * penalty)), 2)
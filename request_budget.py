@@ -0,0 +1,144 @@
+"""
+Planificador de cuota diaria para proveedores UV con límite de peticiones.
+
+Cuenta las llamadas por proveedor y día (persistidas en disco) y reparte la
+cuota a lo largo del día en proporción al UV esperado en cielo despejado:
+a una hora dada solo se permite haber gastado la fracción de cuota
+correspondiente al UV esperado acumulado hasta ese momento. Así un fallo de
+la API principal por la mañana no agota la cuota antes del mediodía solar.
+"""
+
+import json
+import logging
+import math
+import os
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Resolución de la curva de UV esperado
+_STEP_MINUTES = 10
+
+
+def expected_clear_sky_uv(when: datetime, lat: float, lon: float) -> float:
+    """UV esperado con cielo despejado según la elevación solar (aprox. UV = 12.5 * mu^2.42)"""
+    utc = when.astimezone(timezone.utc)
+    day_of_year = utc.timetuple().tm_yday
+    declination = math.radians(23.44) * math.sin(2 * math.pi * (284 + day_of_year) / 365)
+
+    solar_time = utc.hour + utc.minute / 60 + lon / 15
+    hour_angle = math.radians(15 * (solar_time - 12))
+
+    phi = math.radians(lat)
+    mu = (math.sin(phi) * math.sin(declination) +
+          math.cos(phi) * math.cos(declination) * math.cos(hour_angle))
+    if mu <= 0:
+        return 0.0
+    return 12.5 * mu ** 2.42
+
+
+class RequestBudget:
+    """Controla el gasto diario de peticiones a proveedores con cuota"""
+
+    def __init__(self, state_file: str, quotas: dict, lat: float, lon: float,
+                 tz=timezone.utc, min_expected_uv: float = 1.0):
+        self.state_file = state_file
+        self.quotas = quotas
+        self.lat = lat
+        self.lon = lon
+        self.tz = tz
+        self.min_expected_uv = min_expected_uv
+        self._curve_day = None
+        self._curve = []
+        self.state = self._load()
+
+    def _load(self) -> dict:
+        try:
+            if Path(self.state_file).exists():
+                with open(self.state_file, 'r') as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.error(f"Error cargando presupuesto de peticiones: {e}")
+        return {}
+
+    def _save(self):
+        try:
+            path = Path(self.state_file)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{path.name}.tmp")
+            with open(tmp, 'w') as f:
+                json.dump(self.state, f, indent=2)
+            os.replace(tmp, path)
+        except Exception as e:
+            logger.error(f"Error guardando presupuesto de peticiones: {e}")
+
+    def _today(self, now: datetime) -> str:
+        today = now.date().isoformat()
+        if self.state.get('date') != today:
+            self.state = {'date': today, 'used': {}}
+        return today
+
+    def _cumulative_curve(self, now: datetime):
+        """Fracción acumulada del UV esperado del día, por tramos de _STEP_MINUTES"""
+        day = now.date()
+        if self._curve_day != day:
+            start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+            steps = 24 * 60 // _STEP_MINUTES
+            weights = [expected_clear_sky_uv(start + timedelta(minutes=i * _STEP_MINUTES), self.lat, self.lon)
+                       for i in range(steps)]
+            total = sum(weights) or 1.0
+            running = 0.0
+            self._curve = []
+            for weight in weights:
+                running += weight
+                self._curve.append(running / total)
+            self._curve_day = day
+        return self._curve
+
+    def used(self, provider: str, now: datetime = None) -> int:
+        now = now or datetime.now(self.tz)
+        self._today(now)
+        return self.state['used'].get(provider, 0)
+
+    def allowance(self, provider: str, now: datetime = None) -> int:
+        """Número de peticiones que se pueden haber gastado hasta ahora"""
+        now = now or datetime.now(self.tz)
+        quota = self.quotas.get(provider)
+        if quota is None:
+            return float('inf')
+        curve = self._cumulative_curve(now)
+        index = min((now.hour * 60 + now.minute) // _STEP_MINUTES, len(curve) - 1)
+        return math.ceil(quota * curve[index])
+
+    def allow(self, provider: str, now: datetime = None) -> bool:
+        """Indica si merece la pena gastar una petición ahora"""
+        now = now or datetime.now(self.tz)
+        quota = self.quotas.get(provider)
+        if quota is None:
+            return True
+
+        used = self.used(provider, now)
+        if used >= quota:
+            logger.warning(f"Cuota diaria de {provider} agotada ({used}/{quota})")
+            return False
+
+        expected_uv = expected_clear_sky_uv(now, self.lat, self.lon)
+        if expected_uv < self.min_expected_uv:
+            logger.info(f"Petición a {provider} denegada: UV esperado bajo ({expected_uv:.1f})")
+            return False
+
+        allowance = self.allowance(provider, now)
+        if used >= allowance:
+            logger.info(f"Petición a {provider} denegada: reservando cuota para horas de más UV "
+                        f"({used}/{quota} usadas, {allowance} permitidas hasta ahora)")
+            return False
+
+        return True
+
+    def record_call(self, provider: str, now: datetime = None):
+        """Registra una petición gastada y la persiste"""
+        now = now or datetime.now(self.tz)
+        self._today(now)
+        self.state['used'][provider] = self.state['used'].get(provider, 0) + 1
+        self._save()
@@ -0,0 +1,48 @@
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StateCheckpoint:
+    """Guarda y restaura el estado en ejecución del monitor de forma atómica"""
+
+    def __init__(self, path: str, max_age_hours: float = 12):
+        self.path = path
+        self.max_age_hours = max_age_hours
+
+    def save(self, state: dict):
+        """Escribe el checkpoint: fichero temporal + fsync + rename"""
+        try:
+            path = Path(self.path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            payload = dict(state, saved_at=time.time())
+            with open(tmp, 'w') as f:
+                json.dump(payload, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        except Exception as e:
+            logger.error(f"Error guardando checkpoint de estado: {e}")
+
+    def load(self) -> Optional[dict]:
+        """Lee el checkpoint si existe y no es demasiado antiguo"""
+        try:
+            if not Path(self.path).exists():
+                return None
+            with open(self.path, 'r') as f:
+                state = json.load(f)
+        except Exception as e:
+            logger.error(f"Error cargando checkpoint de estado: {e}")
+            return None
+
+        age_hours = (time.time() - state.get('saved_at', 0)) / 3600
+        if age_hours > self.max_age_hours:
+            logger.info(f"Checkpoint descartado por antiguo ({age_hours:.1f}h)")
+            return None
+        return state
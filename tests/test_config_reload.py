@@ -0,0 +1,42 @@
+import asyncio
+
+from config_reload import ConfigReloader
+
+
+class FakeMonitor:
+    def __init__(self):
+        self.applied = []
+
+    def apply_settings(self, settings):
+        self.applied.append(settings)
+        return [f"{name}={value}" for name, value in settings.items()]
+
+
+def start_and_stop(reloader):
+    async def run():
+        reloader.start()
+        reloader.stop()
+    asyncio.run(run())
+
+
+def test_config_file_is_applied_at_startup(tmp_path):
+    config = tmp_path / 'uv_monitor.env'
+    config.write_text("UV_THRESHOLD=5\nSKIN_TYPE=3\n")
+    monitor = FakeMonitor()
+    start_and_stop(ConfigReloader(monitor, str(config), poll_seconds=0))
+    assert monitor.applied == [{'UV_THRESHOLD': 5.0, 'SKIN_TYPE': 3}]
+
+
+def test_invalid_config_at_startup_is_logged_and_not_applied(tmp_path, caplog):
+    config = tmp_path / 'uv_monitor.env'
+    config.write_text("UV_THRESHOLD=5\nSKIN_TYPE=9\n")
+    monitor = FakeMonitor()
+    start_and_stop(ConfigReloader(monitor, str(config), poll_seconds=0))
+    assert monitor.applied == []
+    assert 'SKIN_TYPE=9 fuera de rango' in caplog.text
+
+
+def test_missing_config_file_is_ignored(tmp_path):
+    monitor = FakeMonitor()
+    start_and_stop(ConfigReloader(monitor, str(tmp_path / 'no_existe.env'), poll_seconds=0))
+    assert monitor.applied == []
@@ -0,0 +1,28 @@
+from datetime import datetime
+
+import pytz
+
+from exposure_planner import build_day_plan, safe_uv_limit
+
+TZ = pytz.timezone('Europe/Madrid')
+
+
+def at(hour, minute=0):
+    return TZ.localize(datetime(2026, 7, 1, hour, minute)).timestamp()
+
+
+def test_best_windows_ranked_by_mean_uv():
+    limit = safe_uv_limit(2, 30)
+    # Tramo seguro largo con UV cerca del límite y tramo corto con UV muy bajo
+    forecast = [
+        (at(9), limit - 0.2), (at(12), limit - 0.2), (at(12, 30), limit + 3),
+        (at(16), limit + 3), (at(16, 30), 0.5), (at(17, 30), 0.5),
+    ]
+    plan = build_day_plan(forecast, TZ.localize(datetime(2026, 7, 1, 7)), TZ.localize(datetime(2026, 7, 1, 21)))
+    best = plan['perfiles'][2]['mejores']
+
+    means = [mean for _, _, mean in best]
+    assert means == sorted(means)
+    # El tramo de la tarde (UV bajo) va primero aunque sea más corto
+    assert best[0][0] >= at(16)
+    assert best[1][0] == at(9)
@@ -0,0 +1,87 @@
+import pytest
+
+from reading_filter import ProviderReading, ReadingFilter
+
+NOW = 1_750_000_000.0
+
+
+def feed(reading_filter, values, provider='currentuvindex'):
+    """Procesa una serie de un solo proveedor y devuelve el valor fusionado de cada ciclo"""
+    results = []
+    for value in values:
+        fused = reading_filter.process([ProviderReading(provider, value, NOW)], now=NOW)
+        results.append(fused.uv if fused else None)
+    return results
+
+
+def test_isolated_spike_is_rejected():
+    assert feed(ReadingFilter(), [3, 3, 3, 3, 9, 3, 3]) == [3, 3, 3, 3, None, 3, 3]
+
+
+def test_step_change_accepted_on_second_reading():
+    results = feed(ReadingFilter(), [3] * 7 + [7] * 4)
+    assert results[:7] == [3] * 7
+    assert results[7] is None
+    assert results[8:] == [7, 7, 7]
+
+
+def test_morning_ramp_loses_at_most_one_reading():
+    results = feed(ReadingFilter(), [2, 2.5, 3, 5, 6.8, 8.5])
+    assert results == [2, 2.5, 3, None, 6.8, 8.5]
+
+
+def test_spikes_in_opposite_directions_do_not_confirm_each_other():
+    assert feed(ReadingFilter(), [3, 3, 3, 3, 9, 0.5, 3]) == [3, 3, 3, 3, None, None, 3]
+
+
+def test_step_corroborated_by_other_provider_is_accepted_at_once():
+    reading_filter = ReadingFilter()
+    for _ in range(5):
+        reading_filter.process([ProviderReading('currentuvindex', 3, NOW), ProviderReading('openuv', 3, NOW)], now=NOW)
+
+    fused = reading_filter.process([ProviderReading('currentuvindex', 7, NOW),
+                                    ProviderReading('openuv', 7.4, NOW)], now=NOW)
+    assert fused is not None
+    assert fused.rejected == []
+    assert fused.uv == pytest.approx(7.2, abs=0.1)
+
+
+def test_step_matching_expected_uv_is_accepted():
+    reading_filter = ReadingFilter()
+    feed(reading_filter, [3] * 5)
+    fused = reading_filter.process([ProviderReading('currentuvindex', 7, NOW)], expected_uv=7.5, now=NOW)
+    assert fused is not None and fused.uv == 7
+
+
+def test_stale_zero_rejected_when_sun_is_high():
+    reading_filter = ReadingFilter()
+    assert reading_filter.process([ProviderReading('currentuvindex', 0, NOW)], expected_uv=6, now=NOW) is None
+    # De noche el cero es válido
+    assert reading_filter.process([ProviderReading('currentuvindex', 0, NOW)], expected_uv=0, now=NOW).uv == 0
+
+
+def test_stale_zero_never_confirmed_by_repetition():
+    reading_filter = ReadingFilter()
+    for _ in range(3):
+        assert reading_filter.process([ProviderReading('currentuvindex', 0, NOW)], expected_uv=6, now=NOW) is None
+
+
+def test_fusion_prefers_fresher_data():
+    fused = ReadingFilter().process([ProviderReading('currentuvindex', 4, NOW),
+                                     ProviderReading('openuv', 6, NOW - 45 * 60)], now=NOW)
+    assert 4 < fused.uv < 5
+    assert fused.providers == ['currentuvindex', 'openuv']
+
+
+def test_estimate_has_fixed_low_confidence():
+    reading_filter = ReadingFilter(estimate_confidence=0.3)
+    fused = reading_filter.process([ProviderReading('estimacion', 5, NOW)], now=NOW)
+    assert fused.confidence == 0.3
+
+
+def test_agreeing_providers_are_more_confident_than_disagreeing():
+    agree = ReadingFilter().process([ProviderReading('currentuvindex', 5, NOW),
+                                     ProviderReading('openuv', 5.2, NOW)], now=NOW)
+    disagree = ReadingFilter().process([ProviderReading('currentuvindex', 7.5, NOW),
+                                        ProviderReading('openuv', 4.5, NOW)], now=NOW)
+    assert agree.confidence > disagree.confidence
@@ -0,0 +1,50 @@
+import json
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PROBE = '''
+import logging
+import threading
+
+
+def worker_state():
+    return ([thread.name for thread in threading.enumerate()],
+            [type(handler).__name__ for handler in logging.getLogger().handlers])
+'''
+
+# uv_monitor hace de __main__, como con `python uv_monitor.py`: el forkserver y los
+# workers lo importan como __mp_main__ antes de que parent_process() esté definido
+DRIVER = '''
+import json
+import sys
+
+import uv_monitor
+sys.modules['__main__'] = uv_monitor
+
+import probe
+from uv_chart import create_render_pool
+
+if __name__ == '__main__':
+    pool = create_render_pool()
+    print(json.dumps(pool.submit(probe.worker_state).result(timeout=60)))
+    pool.shutdown()
+'''
+
+
+def test_render_worker_has_no_log_listener(tmp_path):
+    (tmp_path / 'probe.py').write_text(textwrap.dedent(PROBE))
+    (tmp_path / 'driver.py').write_text(textwrap.dedent(DRIVER))
+    result = subprocess.run(
+        [sys.executable, str(tmp_path / 'driver.py')], cwd=ROOT, capture_output=True, text=True, timeout=120,
+        env={'PYTHONPATH': f"{ROOT}:{tmp_path}", 'LOG_FILE': str(tmp_path / 'uv_monitor.log'),
+             'PATH': '/usr/bin:/bin'},
+    )
+    assert result.returncode == 0, result.stderr
+    threads, handlers = json.loads(result.stdout.strip().splitlines()[-1])
+    assert threads == ['MainThread']
+    assert 'QueueHandler' not in handlers
+    assert not (tmp_path / 'uv_monitor.log').exists()
@@ -0,0 +1,24 @@
+import json
+
+from tracing import Tracer
+
+
+def test_trace_continues_id_and_records_queue_span(tmp_path):
+    tracer = Tracer()
+    tracer.configure(str(tmp_path / 'traces.jsonl'))
+
+    with tracer.trace('consulta_uv_ha') as leader:
+        with tracer.span('consulta_proveedor'):
+            pass
+    with tracer.trace('ciclo_uv_ha', trace_id=leader.trace_id) as replica:
+        tracer.add_span('cola_lectura', replica.start - 30, replica.start)
+
+    leader_record, replica_record = [json.loads(line) for line in (tmp_path / 'traces.jsonl').read_text().splitlines()]
+    assert replica_record['trace_id'] == leader_record['trace_id']
+    queue = replica_record['spans'][0]
+    assert queue['name'] == 'cola_lectura'
+    assert queue['duration_ms'] == 30000
+
+
+def test_add_span_without_trace_is_ignored():
+    Tracer().add_span('cola_lectura', 0, 1)
@@ -0,0 +1,32 @@
+import multiprocessing
+
+from uv_snapshot import SnapshotWriter, read_snapshot
+
+
+def _write_many(path, value, count):
+    writer = SnapshotWriter(path)
+    for n in range(count):
+        writer.publish(float(value), f"r{value}", None, False, 6.0, forecast=[(n, float(value))] * 3)
+    writer.close()
+
+
+def test_several_writers_keep_the_sequence_consistent(tmp_path):
+    path = str(tmp_path / 'uv_snapshot.bin')
+    context = multiprocessing.get_context('spawn')
+    writers = [context.Process(target=_write_many, args=(path, value, 500)) for value in (1, 2, 3)]
+    for process in writers:
+        process.start()
+
+    while any(process.is_alive() for process in writers):
+        snapshot = read_snapshot(path)
+        if snapshot:
+            # Nunca una mezcla de dos escritores
+            assert snapshot['provider'] == f"r{int(snapshot['uv_index'])}"
+            assert all(uv == snapshot['uv_index'] for _, uv in snapshot['forecast'])
+    for process in writers:
+        process.join()
+        assert process.exitcode == 0
+
+    with open(path, 'rb') as f:
+        seq = int.from_bytes(f.read()[8:16], 'little')
+    assert seq == 3 * 500 * 2
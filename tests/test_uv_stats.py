@@ -0,0 +1,54 @@
+from datetime import date, datetime, time, timedelta
+
+import pytz
+
+from uv_stats import RETENTION, RollingStats
+
+TZ = pytz.timezone('Europe/Madrid')
+
+
+def history_for(days):
+    return {day.isoformat(): {'peak_uv': 7.0, 'peak_time': '14:00', 'minutes_above_threshold': 60}
+            for day in days}
+
+
+def test_seed_is_idempotent():
+    stats = RollingStats('/nonexistent/stats.json', threshold=6, tz=TZ)
+    history = history_for(date(2025, 6, 1) + timedelta(days=n) for n in range(10))
+    assert stats.seed_from_history(history) == 10
+    assert stats.seed_from_history(history) == 0
+    assert stats.levels['mes']['2025-06']['days_above'] == 10
+
+
+def test_evicted_days_are_not_seeded_twice():
+    stats = RollingStats('/nonexistent/stats.json', threshold=6, tz=TZ)
+    first_day = date(2024, 1, 1)
+    all_days = [first_day + timedelta(days=n) for n in range(RETENTION['dia'] + 30)]
+
+    # Los 30 primeros días salen del nivel diario pero siguen en su semana y su mes
+    stats.seed_from_history(history_for(all_days[:RETENTION['dia']]))
+    stats.seed_from_history(history_for(all_days[RETENTION['dia']:]))
+    assert len(stats.levels['dia']) == RETENTION['dia']
+    january = stats.levels['mes']['2024-01']['days_above']
+
+    # Un histórico que vuelve a incluir esos días no los cuenta otra vez
+    assert stats.seed_from_history(history_for(all_days[-RETENTION['dia']:])) == 0
+    assert stats.seed_from_history(history_for(all_days[:60])) == 0
+    assert stats.levels['mes']['2024-01']['days_above'] == january == 31
+
+
+def test_seeding_older_history_keeps_recent_live_days():
+    stats = RollingStats('/nonexistent/stats.json', threshold=6, tz=TZ)
+    live_days = [date(2026, 10, 1) + timedelta(days=n) for n in range(10)]
+    for day in live_days:
+        stats.add(TZ.localize(datetime.combine(day, time(13))).timestamp(), 7.0)
+
+    last_seeded = date(2026, 9, 30)
+    stats.seed_from_history(history_for(last_seeded - timedelta(days=n) for n in range(395)))
+
+    days = stats.levels['dia']
+    assert len(days) == RETENTION['dia']
+    assert all(day.isoformat() in days for day in live_days)
+    # Solo caben los 390 días sembrados más recientes
+    assert min(days) == (last_seeded - timedelta(days=389)).isoformat()
+    assert list(days) == sorted(days)
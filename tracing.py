@@ -0,0 +1,190 @@
+"""
+Trazas por ciclo de chequeo UV: desde la hora de medición del proveedor
+hasta la entrega del mensaje en Telegram.
+
+Cada ciclo abre una traza; las etapas (consulta al proveedor, comprobación
+de antigüedad, decisión de alerta, render del mensaje, envío) son spans
+hijos que llevan la hora de los datos del proveedor. Las trazas se exportan
+como líneas JSON a un fichero local (sustituto de un colector) y las
+entregas alimentan un SLO de latencia (antigüedad de los datos + pipeline)
+con percentiles. En modo HA la consulta del líder y la entrega en cada
+réplica son trazas distintas con el mismo trace_id, que viaja en la lectura
+publicada; el tiempo que la lectura espera en el bus es el span `cola_lectura`.
+"""
+
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+_current_trace = contextvars.ContextVar('uv_trace', default=None)
+_current_span = contextvars.ContextVar('uv_span', default=None)
+
+
+class Trace:
+    """Traza de un ciclo: spans y hora de los datos del proveedor"""
+
+    def __init__(self, name: str, attributes: dict, trace_id: Optional[str] = None):
+        self.trace_id = trace_id or uuid.uuid4().hex[:16]
+        self.name = name
+        self.start = time.time()
+        self.end = None
+        self.data_time = None
+        self.attributes = attributes
+        self.spans = []
+        self.deliveries = []
+
+
+class Tracer:
+    """Crea trazas y spans, exporta a fichero y calcula el SLO de latencia"""
+
+    def __init__(self):
+        self.export_path = None
+        self.max_export_bytes = 2 * 1024 * 1024
+        self.slo_minutes = 90.0
+        self.latencies = deque(maxlen=500)
+        self._lock = threading.Lock()
+
+    def configure(self, export_path: Optional[str], slo_minutes: float = 90.0, window: int = 500):
+        self.export_path = export_path
+        self.slo_minutes = slo_minutes
+        self.latencies = deque(self.latencies, maxlen=window)
+
+    @contextmanager
+    def trace(self, name: str, trace_id: Optional[str] = None, **attributes):
+        """Abre una traza raíz para un ciclo completo (o continúa `trace_id` de otro proceso)"""
+        trace = Trace(name, attributes, trace_id)
+        trace_token = _current_trace.set(trace)
+        span_token = _current_span.set(None)
+        try:
+            yield trace
+        finally:
+            trace.end = time.time()
+            _current_span.reset(span_token)
+            _current_trace.reset(trace_token)
+            self._export(trace)
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Span hijo de la traza activa; sin traza activa no hace nada"""
+        trace = _current_trace.get()
+        if trace is None:
+            yield None
+            return
+
+        span = {
+            'span_id': uuid.uuid4().hex[:8],
+            'parent_id': _current_span.get(),
+            'name': name,
+            'start': time.time(),
+            'attributes': dict(attributes),
+        }
+        token = _current_span.set(span['span_id'])
+        try:
+            yield span
+        except Exception as e:
+            span['attributes']['error'] = str(e)
+            raise
+        finally:
+            span['end'] = time.time()
+            _current_span.reset(token)
+            trace.spans.append(span)
+
+    def add_span(self, name: str, start: float, end: float, **attributes):
+        """Span ya medido (p. ej. espera en una cola entre procesos); sin traza activa no hace nada"""
+        trace = _current_trace.get()
+        if trace is None:
+            return
+        trace.spans.append({
+            'span_id': uuid.uuid4().hex[:8],
+            'parent_id': _current_span.get(),
+            'name': name,
+            'start': start,
+            'end': max(start, end),
+            'attributes': dict(attributes),
+        })
+
+    def set_data_time(self, data_time: Optional[float]):
+        """Hora (epoch) de la medición del proveedor para la traza activa"""
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.data_time = data_time
+
+    def record_delivery(self):
+        """Registra una entrega: latencia = ahora - hora de los datos (o inicio del ciclo)"""
+        trace = _current_trace.get()
+        if trace is None:
+            return
+        now = time.time()
+        origin = trace.data_time or trace.start
+        latency = now - origin
+        trace.deliveries.append({'at': now, 'latency_seconds': round(latency, 3)})
+        with self._lock:
+            self.latencies.append(latency)
+
+    def slo_summary(self) -> dict:
+        """Percentiles de latencia extremo a extremo y cumplimiento del objetivo"""
+        with self._lock:
+            values = sorted(self.latencies)
+        if not values:
+            return {'entregas': 0, 'objetivo_minutos': self.slo_minutes}
+
+        def percentile(p):
+            return round(values[min(len(values) - 1, int(len(values) * p))] / 60, 2)
+
+        within = sum(1 for value in values if value <= self.slo_minutes * 60)
+        return {
+            'entregas': len(values),
+            'p50_minutos': percentile(0.50),
+            'p90_minutos': percentile(0.90),
+            'p99_minutos': percentile(0.99),
+            'objetivo_minutos': self.slo_minutes,
+            'cumplimiento': round(within / len(values), 3),
+        }
+
+    def _export(self, trace: Trace):
+        """Exporta la traza como línea JSON; los spans heredan la hora de los datos"""
+        if not self.export_path:
+            return
+        record = {
+            'trace_id': trace.trace_id,
+            'name': trace.name,
+            'start': trace.start,
+            'duration_ms': round((trace.end - trace.start) * 1000, 2),
+            'data_time': trace.data_time,
+            'attributes': trace.attributes,
+            'deliveries': trace.deliveries,
+            'spans': [
+                dict(span,
+                     duration_ms=round((span['end'] - span['start']) * 1000, 2),
+                     attributes=dict(span['attributes'], data_time=trace.data_time))
+                for span in trace.spans
+            ],
+        }
+        try:
+            path = Path(self.export_path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Rotación simple para no llenar la tarjeta SD
+            if path.exists() and path.stat().st_size > self.max_export_bytes:
+                os.replace(path, f"{path}.1")
+            with open(path, 'a') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        except Exception as e:
+            logger.error(f"Error exportando traza: {e}")
+
+
+# Tracer compartido por el monitor y el cliente de APIs
+tracer = Tracer()
+tracer.configure(
+    os.getenv('TRACE_FILE', '/app/logs/traces.jsonl') or None,
+    slo_minutes=float(os.getenv('TRACE_SLO_MINUTES', '90')),
+)
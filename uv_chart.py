@@ -0,0 +1,88 @@
+"""
+Gráfica diaria de UV (observado + previsión + umbral) en PNG.
+
+render_day_chart es una función de nivel de módulo para poder ejecutarse en
+un ProcessPoolExecutor sin bloquear el event loop. matplotlib es opcional:
+si no está instalado, render_day_chart lanza ImportError.
+"""
+
+import io
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+
+def create_render_pool() -> ProcessPoolExecutor:
+    """Pool de render con forkserver: el monitor ya tiene hilos (logging, APIs) y
+    hacer fork de un proceso con hilos puede dejar al hijo bloqueado"""
+    return ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('forkserver'))
+
+
+def render_day_chart(observed, forecast, threshold, title, tz_name='Europe/Madrid') -> bytes:
+    """Dibuja la curva del día. observed/forecast: listas de (epoch, uv)"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.dates as mdates
+    import matplotlib.pyplot as plt
+    import pytz
+
+    tz = pytz.timezone(tz_name)
+
+    fig, ax = plt.subplots(figsize=(8, 4), dpi=100)
+    try:
+        if forecast:
+            times = [datetime.fromtimestamp(epoch, tz) for epoch, _ in forecast]
+            ax.plot(times, [uv for _, uv in forecast], '--', color='#999999', label='Previsión')
+        if observed:
+            times = [datetime.fromtimestamp(epoch, tz) for epoch, _ in observed]
+            ax.plot(times, [uv for _, uv in observed], 'o-', color='#e67e22', label='Observado')
+
+        # Banda de peligro por encima del umbral
+        top = max([threshold + 2] + [uv + 1 for _, uv in list(observed) + list(forecast)])
+        ax.axhspan(threshold, top, color='#e74c3c', alpha=0.12, label=f'Umbral ({threshold})')
+        ax.axhline(threshold, color='#e74c3c', linewidth=1)
+
+        ax.set_ylim(0, top)
+        ax.set_title(title)
+        ax.set_ylabel('Índice UV')
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M', tz=tz))
+        ax.grid(alpha=0.3)
+        ax.legend(loc='upper left', fontsize='small')
+        fig.tight_layout()
+
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png')
+        return buffer.getvalue()
+    finally:
+        plt.close(fig)
+
+
+class ChartCache:
+    """Caché LRU de gráficas por (ubicación, día, versión de datos).
+
+    Guarda el PNG y, tras el primer envío, el file_id de Telegram para
+    reenviar la misma imagen sin volver a subirla.
+    """
+
+    def __init__(self, max_entries: int = 8):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key, png: bytes = None, file_id: str = None):
+        entry = self._entries.setdefault(key, {'png': None, 'file_id': None})
+        if png is not None:
+            entry['png'] = png
+        if file_id is not None:
+            entry['file_id'] = file_id
+            # Con file_id ya no hace falta conservar los bytes
+            entry['png'] = None
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
@@ -11,7 +11,7 @@ import schedule
 import time
 import logging
 import threading
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timezone, timedelta, time as dtime
 from typing import Dict, Optional, Tuple
 import asyncio
 from telegram import Bot, Update
@@ -21,47 +21,122 @@ import pytz
 import json
 from pathlib import Path
 from openweather_api import CurrentUVIndexAPI
-
-# Configuración de logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('/app/logs/uv_monitor.log')
-    ]
-)
+from leader_election import LeaderElection, ReadingBus
+from uv_snapshot import SnapshotWriter
+from log_pipeline import setup_logging_from_env
+from state_checkpoint import StateCheckpoint
+from uv_chart import render_day_chart, create_render_pool, ChartCache
+from local_api import EventHub, LocalAPIServer
+from tracing import tracer
+from config_reload import ConfigReloader
+from uv_stats import RollingStats
+from live_status import LiveStatusMessage
+from exposure_planner import BURN_BASE_MINUTES, build_day_plan
 
 logger = logging.getLogger(__name__)
 
 class UVMonitor:
     """Monitor de radiación UV para Vitoria-Gasteiz"""
     
-    def __init__(self):
+    def __init__(self, config: Optional[dict] = None, uv_api: Optional[CurrentUVIndexAPI] = None):
+        # Configuración por bot (multi_bot.py); lo que no aparezca se toma del entorno
+        self.config = config or {}
+        self.name = self.config.get('name', 'uv-monitor')
+        
         # Configuración desde variables de entorno
-        self.telegram_token = os.getenv('TELEGRAM_BOT_TOKEN')
-        self.chat_id = os.getenv('TELEGRAM_CHAT_ID')
-        self.uv_threshold = float(os.getenv('UV_THRESHOLD', '6'))
-        self.skin_type = int(os.getenv('SKIN_TYPE', '2'))
-        self.check_interval = int(os.getenv('CHECK_INTERVAL_MINUTES', '30'))
+        self.telegram_token = self.setting('TELEGRAM_BOT_TOKEN')
+        self.chat_id = self.setting('TELEGRAM_CHAT_ID')
+        self.uv_threshold = float(self.setting('UV_THRESHOLD', '6'))
+        self.skin_type = int(self.setting('SKIN_TYPE', '2'))
+        self.check_interval = int(self.setting('CHECK_INTERVAL_MINUTES', '30'))
+        # Los cambios de estado con confianza menor se retienen hasta que varias lecturas
+        # seguidas o un tiempo máximo los confirman
+        self.alert_min_confidence = float(self.setting('ALERT_MIN_CONFIDENCE', '0.5'))
+        self.alert_confirm_readings = int(self.setting('ALERT_CONFIRM_READINGS', '2'))
+        self.alert_confirm_minutes = float(self.setting('ALERT_CONFIRM_MINUTES', '60'))
+        # Cambio retenido: {'estado': bool, 'lecturas': n, 'desde': epoch}
+        self.pending_alert = None
         
-        # API de CurrentUVIndex (tiempo real)
-        self.uv_api = CurrentUVIndexAPI()
+        # API de CurrentUVIndex (tiempo real); compartible entre varios bots
+        self.uv_api = uv_api or CurrentUVIndexAPI()
         
         # Estado actual
         self.current_uv_index = 0
         self.is_dangerous = False
         self.last_alert_sent = None
+        self.current_provider = None
+        self.current_data_time = None
+        self.current_forecast = []
+        self.current_confidence = None
+        self.last_reading_at = None
+        
+        # Lecturas del día para la gráfica; la versión cambia con cada lectura nueva
+        self.today_readings = []
+        self.data_version = 0
+        
+        # Gráficas: render fuera del event loop y caché por (ubicación, día, versión)
+        self.chart_cache = ChartCache()
+        self.chart_pool = None
+        self.chart_renders = {}
+        
+        # Eventos para la API local (SSE) y servidor HTTP opcional
+        self.event_hub = EventHub()
+        self.local_api = None
+        
+        # Próximo chequeo programado (epoch); 0 = inmediato. El evento despierta
+        # al worker cuando una recarga de configuración cambia el plazo
+        self.next_check_at = 0
+        self.schedule_changed = asyncio.Event()
+        self.config_reloader = None
+        self.settings_refresh_task = None
+        
+        # Modo alta disponibilidad: varias réplicas, un único líder consulta las APIs
+        self.ha_mode = self.setting('HA_MODE', 'false').lower() == 'true'
+        
+        # Checkpoint del estado para reinicios en caliente
+        self.checkpoint = StateCheckpoint(
+            self.chat_state_path('CHECKPOINT_FILE', 'monitor_state.json'),
+            max_age_hours=float(self.setting('CHECKPOINT_MAX_AGE_HOURS', '12'))
+        )
+        
+        # Snapshot mmap de la última lectura para herramientas locales
+        self.snapshot = SnapshotWriter(self.state_path('UV_SNAPSHOT_FILE', 'uv_snapshot.bin'))
         
         # Bot de Telegram
         self.bot = Bot(token=self.telegram_token)
         self.application = None
         
+        # Modo difusión: un mensaje fijado por chat que se edita en lugar de enviar
+        # mensajes nuevos; estos quedan para cruces de umbral y recordatorios
+        self.live_status = None
+        if self.setting('LIVE_STATUS', 'false').lower() == 'true':
+            self.live_status = LiveStatusMessage(
+                self.chat_id,
+                self.chat_state_path('LIVE_STATUS_FILE', 'live_status.json'),
+                min_edit_seconds=float(self.setting('LIVE_STATUS_MIN_EDIT_SECONDS', '60'))
+            )
+        
+        # Updates procesados en paralelo (0 = secuencial). Los handlers solo leen
+        # instantáneas del estado y lo actualizan sustituyendo objetos completos
+        self.concurrent_updates = int(self.setting('BOT_CONCURRENT_UPDATES', '32'))
+        
         # Timezone
         self.tz = pytz.timezone('Europe/Madrid')
         
+        # Plan de exposición del día por tipo de piel: se recalcula solo con previsión nueva
+        self.exposure_plan = {}
+        self.planned_forecast = None
+        self.plan_exposure_minutes = float(self.setting('PLAN_EXPOSURE_MINUTES', '30'))
+        # Resumen de la mañana con el plan (-1 = desactivado)
+        self.morning_summary_hour = int(self.setting('MORNING_SUMMARY_HOUR', '8'))
+        self.morning_summary_sent_on = None
+        
+        # Agregados incrementales (hora/día/semana/mes) para /estadisticas
+        self.stats = RollingStats(self.chat_state_path('UV_STATS_FILE', 'uv_stats.json'), self.uv_threshold, self.tz)
+        self.load_stats()
+        
         # Sistema de tracking de protector solar
-        self.sunscreen_file = '/app/logs/sunscreen_tracking.json'
+        self.sunscreen_file = self.chat_state_path('SUNSCREEN_FILE', 'sunscreen_tracking.json')
         self.sunscreen_data = self.load_sunscreen_data()
         
         # Horas de luz UV en Vitoria-Gasteiz (basado en solsticio de verano)
@@ -69,6 +144,34 @@ class UVMonitor:
         # UV puede empezar ~1h después del amanecer y terminar ~1h antes del anochecer
         self.uv_start_hour = 7  # 07:30 aproximadamente
         self.uv_end_hour = 21   # 21:00 aproximadamente
+        
+        # Estado compartido del modo HA (ver self.ha_mode)
+        self.ha_poll_seconds = int(self.setting('HA_POLL_SECONDS', '30'))
+        self.leader_election = LeaderElection(self.state_path('HA_LOCK_FILE', 'uv_leader.lock'))
+        self.reading_bus = ReadingBus(self.state_path('HA_STATE_FILE', 'uv_shared_state.json'))
+        self.last_reading_seq = 0
+    
+    def setting(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        """Valor de configuración: clave en minúsculas del config o variable de entorno"""
+        if name.lower() in self.config:
+            return str(self.config[name.lower()])
+        return os.getenv(name, default)
+    
+    def state_path(self, name: str, filename: str) -> str:
+        """Ruta de un fichero de estado: explícita, bajo state_dir del bot o por defecto en /app/logs"""
+        if name.lower() in self.config:
+            return self.config[name.lower()]
+        if 'state_dir' in self.config:
+            return os.path.join(self.config['state_dir'], filename)
+        return os.getenv(name, f'/app/logs/{filename}')
+    
+    def chat_state_path(self, name: str, filename: str) -> str:
+        """Como state_path, pero en modo HA un fichero por chat: las réplicas comparten /app/logs"""
+        path = self.state_path(name, filename)
+        if self.ha_mode:
+            root, ext = os.path.splitext(path)
+            path = f"{root}.{self.chat_id}{ext}"
+        return path
     
     def is_uv_hours(self) -> bool:
         """Verifica si estamos en horas donde puede haber UV significativo"""
@@ -110,6 +213,7 @@ class UVMonitor:
             
             if uv_index is not None:
                 logger.info(f"Índice UV obtenido: {uv_index}")
+                self.adopt_reading_source()
                 return uv_index
             else:
                 logger.warning("No se pudo obtener el índice UV")
@@ -117,21 +221,20 @@ class UVMonitor:
             
         except Exception as e:
             logger.error(f"Error obteniendo datos UV: {e}")
-            return None    
+            return None
+    
+    def adopt_reading_source(self):
+        """Copia proveedor, hora de los datos, previsión y confianza de la última consulta a la API"""
+        self.current_provider = self.uv_api.last_provider
+        self.current_data_time = self.uv_api.last_data_time
+        self.current_forecast = self.uv_api.last_forecast
+        self.current_confidence = self.uv_api.last_confidence
+    
     def calculate_safe_exposure_time(self, uv_index: float) -> int:
         """Calcula el tiempo seguro de exposición según el tipo de piel"""
-        # Tiempos base en minutos para quemadura según tipo de piel (sin protección)
-        base_times = {
-            1: 67,   # Tipo I - Muy clara
-            2: 100,  # Tipo II - Clara
-            3: 200,  # Tipo III - Media
-            4: 300,  # Tipo IV - Morena
-            5: 400,  # Tipo V - Muy morena
-            6: 500   # Tipo VI - Negra
-        }
-        
-        # Ajuste por medicación fotosensibilizante (reduce tiempo en 50%)
-        base_time = base_times.get(self.skin_type, 100) * 0.5
+        # Tiempos base en minutos para quemadura según tipo de piel (sin protección),
+        # con ajuste por medicación fotosensibilizante (reduce tiempo en 50%)
+        base_time = BURN_BASE_MINUTES.get(self.skin_type, 100) * 0.5
         
         # Fórmula: tiempo_seguro = tiempo_base / UV_index
         if uv_index > 0:
@@ -171,49 +274,459 @@ class UVMonitor:
     async def send_telegram_message(self, message: str):
         """Envía mensaje a Telegram"""
         try:
-            await self.bot.send_message(
-                chat_id=self.chat_id,
-                text=message,
-                parse_mode='HTML'
-            )
+            with tracer.span('send_message', chat_id=str(self.chat_id)):
+                await self.bot.send_message(
+                    chat_id=self.chat_id,
+                    text=message,
+                    parse_mode='HTML'
+                )
+            tracer.record_delivery()
             logger.info(f"Mensaje enviado: {message[:50]}...")
         except TelegramError as e:
             logger.error(f"Error enviando mensaje Telegram: {e}")    
     async def check_uv_and_alert(self):
         """Verifica UV y envía alertas si es necesario"""
-        uv_index = self.get_uv_data()
+        with tracer.trace('ciclo_uv', bot=self.name) as trace:
+            with tracer.span('consulta_proveedor'):
+                uv_index = self.get_uv_data()
+            
+            if uv_index is None:
+                logger.warning("No se pudieron obtener datos UV")
+                return
+            
+            tracer.set_data_time(self.current_data_time)
+            await self.process_uv_reading(uv_index)
         
-        if uv_index is None:
-            logger.warning("No se pudieron obtener datos UV")
+        self.log_trace_latency(trace)
+    
+    def log_trace_latency(self, trace):
+        """Registra la latencia de las entregas del ciclo y el estado del SLO"""
+        if not trace.deliveries:
             return
-        
+        latency_min = trace.deliveries[-1]['latency_seconds'] / 60
+        slo = tracer.slo_summary()
+        logger.info(f"Latencia datos→entrega: {latency_min:.1f} min "
+                    f"(p50 {slo['p50_minutos']} / p99 {slo['p99_minutos']} min, "
+                    f"cumplimiento {slo['cumplimiento']:.0%} del objetivo de {slo['objetivo_minutos']:.0f} min)")
+    
+    async def process_uv_reading(self, uv_index: float):
+        """Aplica una lectura UV al estado y envía las alertas correspondientes"""
         try:
             self.current_uv_index = float(uv_index)
+            self.last_reading_at = time.time()
+            self.record_today_reading()
+            self.stats.add(self.last_reading_at, self.current_uv_index)
+            self.refresh_exposure_plan()
+            was_dangerous = self.is_dangerous
             
             # Determinar si es peligroso
             is_dangerous_now = self.current_uv_index >= self.uv_threshold
             
-            # Generar mensaje si hay cambio de estado
-            if is_dangerous_now != self.is_dangerous:
-                await self.send_alert(is_dangerous_now)
-                self.is_dangerous = is_dangerous_now
-            # También enviar alerta si UV baja por debajo del umbral
-            elif self.is_dangerous and self.current_uv_index < self.uv_threshold:
-                await self.send_safe_alert()
-                self.is_dangerous = False
-            
-            # Verificar recordatorios de protector solar
-            if self.check_sunscreen_expiry():
-                await self.send_sunscreen_reminder()
+            with tracer.span('decision_alerta', uv=self.current_uv_index, peligroso=is_dangerous_now,
+                             previo=self.is_dangerous, confianza=self.current_confidence):
+                # Una lectura que no pide el cambio interrumpe la confirmación en curso
+                if is_dangerous_now == self.is_dangerous:
+                    self.pending_alert = None
+                # Lectura dudosa: no cambiar de estado hasta que otras lecturas lo confirmen
+                if is_dangerous_now != self.is_dangerous and not self.confirm_state_change(is_dangerous_now):
+                    logger.warning(f"Alerta retenida: UV {self.current_uv_index} con confianza "
+                                   f"{self.current_confidence} < {self.alert_min_confidence} "
+                                   f"({self.pending_alert['lecturas']}/{self.alert_confirm_readings} lecturas)")
+                # Generar mensaje si hay cambio de estado
+                elif is_dangerous_now != self.is_dangerous:
+                    await self.send_alert(is_dangerous_now)
+                    self.is_dangerous = is_dangerous_now
+                # También enviar alerta si UV baja por debajo del umbral
+                elif self.is_dangerous and self.current_uv_index < self.uv_threshold:
+                    await self.send_safe_alert()
+                    self.is_dangerous = False
+                
+                # Verificar recordatorios de protector solar
+                if self.check_sunscreen_expiry():
+                    await self.send_sunscreen_reminder()
             
             # Log del estado actual
             level_desc, emoji = self.get_uv_level_description(self.current_uv_index)
             logger.info(f"UV actual: {self.current_uv_index} - {level_desc} {emoji}")
             
+            self.publish_snapshot()
+            self.save_checkpoint()
+            self.stats.save()
+            
+            # Difusión a los clientes de la API local: una serialización por evento
+            payload = self.current_reading_payload()
+            self.event_hub.publish('lectura', payload)
+            if self.is_dangerous != was_dangerous:
+                self.event_hub.publish('alerta', payload)
+            
+            await self.refresh_live_status()
+            await self.maybe_send_morning_summary()
+            
+        except Exception as e:
+            logger.error(f"Error procesando datos UV: {e}")
+    
+    def refresh_exposure_plan(self):
+        """Recalcula el plan del día si la previsión ha cambiado o ha empezado otro día"""
+        today = datetime.now(self.tz).date()
+        if self.current_forecast == self.planned_forecast and self.exposure_plan.get('dia') == today.isoformat():
+            return
+        
+        try:
+            day_start = self.tz.localize(datetime.combine(today, dtime(self.uv_start_hour)))
+            day_end = self.tz.localize(datetime.combine(today, dtime(self.uv_end_hour)))
+            plan = build_day_plan(self.current_forecast, day_start, day_end,
+                                  exposure_minutes=self.plan_exposure_minutes)
+            # Sin previsión para hoy se conserva el plan anterior del mismo día
+            if plan['perfiles'] or self.exposure_plan.get('dia') != plan['dia']:
+                self.exposure_plan = plan
+            self.planned_forecast = self.current_forecast
+        except Exception as e:
+            logger.error(f"Error calculando el plan de exposición: {e}")
+    
+    def render_plan_message(self, skin_type: int) -> str:
+        """Ventanas del plan ya calculado para un tipo de piel (solo las que no han pasado)"""
+        plan = self.exposure_plan
+        profile = plan.get('perfiles', {}).get(skin_type)
+        if plan.get('dia') != datetime.now(self.tz).date().isoformat() or profile is None:
+            return "🗓️ Aún no hay previsión UV para planificar hoy."
+        
+        now = time.time()
+        
+        def span(start, end):
+            start = max(start, now)
+            return (f"{datetime.fromtimestamp(start, self.tz).strftime('%H:%M')}-"
+                    f"{datetime.fromtimestamp(end, self.tz).strftime('%H:%M')}")
+        
+        best = [f"• {span(s, e)} (UV medio {mean})" for s, e, mean in profile['mejores'] if e > now]
+        unsafe = [f"• {span(s, e)} (pico UV {peak})" for s, e, peak in profile['peligrosos'] if e > now]
+        safe = [f"• {span(s, e)}" for s, e in profile['seguros'] if e > now]
+        
+        lines = [
+            f"🗓️ <b>Plan de exposición - Tipo de piel {skin_type}</b>",
+            f"Salidas de {int(plan['minutos_exposicion'])} min sin protección "
+            f"(UV máximo {profile['limite_uv']}, con medicación fotosensibilizante)",
+        ]
+        if best:
+            lines.append("\n✅ <b>Mejores ventanas:</b>")
+            lines.extend(best)
+        if unsafe:
+            lines.append("\n⚠️ <b>Evitar sin protección:</b>")
+            lines.extend(unsafe)
+        if safe and not best:
+            lines.append("\n🟢 <b>Ratos seguros:</b>")
+            lines.extend(safe)
+        if not (best or unsafe or safe):
+            lines.append("\nNo quedan horas de sol previstas hoy.")
+        return "\n".join(lines)
+    
+    async def handle_plan_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Maneja comando /planificar [tipo de piel]"""
+        try:
+            skin_type = self.skin_type
+            if context.args:
+                try:
+                    skin_type = int(context.args[0])
+                except ValueError:
+                    pass
+                if skin_type not in BURN_BASE_MINUTES:
+                    skin_type = self.skin_type
+            
+            await update.message.reply_text(self.render_plan_message(skin_type), parse_mode='HTML')
         except Exception as e:
-            logger.error(f"Error procesando datos UV: {e}")    
+            logger.error(f"Error en comando /planificar: {e}")
+            await update.message.reply_text("❌ Error obteniendo el plan del día.")
+    
+    async def maybe_send_morning_summary(self):
+        """Envía una vez al día, por la mañana, la previsión y el plan de exposición"""
+        if self.morning_summary_hour < 0:
+            return
+        now = datetime.now(self.tz)
+        today = now.date().isoformat()
+        # Solo por la mañana: si el monitor arranca por la tarde no se envía
+        if self.morning_summary_sent_on == today or not self.morning_summary_hour <= now.hour < 12:
+            return
+        if self.exposure_plan.get('dia') != today:
+            return
+        
+        self.morning_summary_sent_on = today
+        upcoming = [(epoch, uv) for epoch, uv in self.current_forecast
+                    if datetime.fromtimestamp(epoch, self.tz).date() == now.date()]
+        peak_line = ""
+        if upcoming:
+            peak_epoch, peak_uv = max(upcoming, key=lambda item: item[1])
+            level_desc, emoji = self.get_uv_level_description(peak_uv)
+            peak_line = (f"\n📈 <b>Pico previsto:</b> UV {peak_uv} ({level_desc} {emoji}) "
+                         f"a las {datetime.fromtimestamp(peak_epoch, self.tz).strftime('%H:%M')}")
+        
+        message = f"""☀️ <b>Buenos días - UV hoy en Vitoria-Gasteiz</b>
+{peak_line}
+
+{self.render_plan_message(self.skin_type)}"""
+        await self.send_telegram_message(message)
+    
+    def render_live_status(self) -> str:
+        """Texto del mensaje fijado. Sin relojes que avancen solos: solo cambia con los datos"""
+        current_uv = self.current_uv_index
+        sunscreen = self.sunscreen_data
+        level_desc, emoji = self.get_uv_level_description(current_uv)
+        
+        if self.is_dangerous:
+            state_line = f"⚠️ <b>Por encima del umbral</b> (UV {self.uv_threshold})"
+        else:
+            state_line = f"✅ Por debajo del umbral (UV {self.uv_threshold})"
+        
+        data_time = self.current_data_time or self.last_reading_at
+        time_line = ""
+        if data_time:
+            data_at = datetime.fromtimestamp(data_time, self.tz).strftime('%H:%M')
+            time_line = f"\n🕐 Datos de las {data_at} ({self.current_provider or 'desconocido'})"
+        
+        sunscreen_line = "\n🧴 Sin protección registrada"
+        if sunscreen:
+            expiry_time = datetime.fromisoformat(sunscreen['expires_at'])
+            if datetime.now(self.tz) < expiry_time:
+                sunscreen_line = f"\n🧴 Protector SPF {sunscreen['spf']} hasta las {expiry_time.strftime('%H:%M')}"
+            else:
+                sunscreen_line = f"\n🧴 Protección expirada a las {expiry_time.strftime('%H:%M')}"
+        
+        return f"""🌞 <b>UV en directo - Vitoria-Gasteiz</b>
+
+<b>UV:</b> {current_uv} ({level_desc} {emoji})
+{state_line}{time_line}{sunscreen_line}"""
+    
+    async def refresh_live_status(self) -> bool:
+        """Edita el mensaje fijado si el contenido ha cambiado (con límite de ediciones).
+        Devuelve True si se ha editado o enviado ya"""
+        if self.live_status is None:
+            return False
+        try:
+            return await self.live_status.update(self.bot, self.render_live_status())
+        except Exception as e:
+            logger.error(f"Error actualizando el estado en directo: {e}")
+            return False
+    
+    def confirm_state_change(self, is_dangerous_now: bool) -> bool:
+        """True si el cambio de estado debe aplicarse: lectura fiable, o bien
+        ALERT_CONFIRM_READINGS lecturas seguidas o ALERT_CONFIRM_MINUTES a favor del cambio"""
+        if self.is_reading_reliable():
+            self.pending_alert = None
+            return True
+        
+        now = self.last_reading_at or time.time()
+        if self.pending_alert is None or self.pending_alert['estado'] != is_dangerous_now:
+            self.pending_alert = {'estado': is_dangerous_now, 'lecturas': 0, 'desde': now}
+        self.pending_alert['lecturas'] += 1
+        
+        confirmed = (self.pending_alert['lecturas'] >= self.alert_confirm_readings
+                     or now - self.pending_alert['desde'] >= self.alert_confirm_minutes * 60)
+        if confirmed:
+            logger.info(f"Cambio de estado confirmado por {self.pending_alert['lecturas']} lecturas "
+                        f"pese a la baja confianza ({self.current_confidence})")
+            self.pending_alert = None
+        return confirmed
+    
+    def is_reading_reliable(self) -> bool:
+        """True si la lectura actual tiene confianza suficiente para cambiar de estado"""
+        if self.current_confidence is None:
+            return True
+        return self.current_confidence >= self.alert_min_confidence
+    
+    def current_reading_payload(self) -> dict:
+        """Lectura actual en formato JSON para la API local"""
+        level_desc, _ = self.get_uv_level_description(self.current_uv_index)
+        return {
+            'uv_index': self.current_uv_index,
+            'nivel': level_desc,
+            'peligroso': self.is_dangerous,
+            'umbral': self.uv_threshold,
+            'proveedor': self.current_provider,
+            'hora_datos': self.current_data_time,
+            'hora_lectura': self.last_reading_at,
+            'confianza': self.current_confidence,
+        }
+    
+    async def start_local_api(self):
+        """Arranca la API HTTP/SSE local si LOCAL_API_PORT > 0 (desactivada por defecto)"""
+        port = int(self.setting('LOCAL_API_PORT', '0'))
+        if port <= 0:
+            return
+        try:
+            self.local_api = LocalAPIServer(self, self.setting('LOCAL_API_HOST', '0.0.0.0'), port)
+            await self.local_api.start()
+        except Exception as e:
+            logger.error(f"Error iniciando API local: {e}")
+            self.local_api = None
+    
+    def save_checkpoint(self):
+        """Guarda el estado en ejecución para poder reanudar tras un reinicio"""
+        self.checkpoint.save({
+            'current_uv_index': self.current_uv_index,
+            'last_reading_at': self.last_reading_at,
+            'provider': self.current_provider,
+            'data_time': self.current_data_time,
+            'forecast': self.current_forecast,
+            'confidence': self.current_confidence,
+            'is_dangerous': self.is_dangerous,
+            'last_alert_sent': self.last_alert_sent,
+            'next_check_at': self.next_check_at,
+            'last_reading_seq': self.last_reading_seq,
+            'today_readings': self.today_readings,
+            'morning_summary_sent_on': self.morning_summary_sent_on,
+            'pending_alert': self.pending_alert,
+        })
+    
+    def restore_checkpoint(self) -> bool:
+        """Restaura el estado guardado. Devuelve True si había un checkpoint válido"""
+        state = self.checkpoint.load()
+        if not state:
+            return False
+        
+        self.current_uv_index = state.get('current_uv_index', 0)
+        self.last_reading_at = state.get('last_reading_at')
+        self.current_provider = state.get('provider')
+        self.current_data_time = state.get('data_time')
+        self.current_forecast = [tuple(item) for item in state.get('forecast', [])]
+        self.current_confidence = state.get('confidence')
+        self.is_dangerous = state.get('is_dangerous', False)
+        self.last_alert_sent = state.get('last_alert_sent')
+        self.next_check_at = state.get('next_check_at', 0)
+        self.last_reading_seq = state.get('last_reading_seq', 0)
+        self.today_readings = [tuple(item) for item in state.get('today_readings', [])]
+        self.morning_summary_sent_on = state.get('morning_summary_sent_on')
+        self.pending_alert = state.get('pending_alert')
+        self.refresh_exposure_plan()
+        
+        # Volver a publicar para los scripts locales
+        self.publish_snapshot()
+        
+        wait_minutes = max(0, int((self.next_check_at - time.time()) / 60))
+        logger.info(f"Estado restaurado: UV {self.current_uv_index}, "
+                    f"peligroso={self.is_dangerous}, próximo chequeo en {wait_minutes} minutos")
+        return True
+    
+    def record_today_reading(self):
+        """Añade la lectura actual a la serie del día (se reinicia al cambiar de día)"""
+        today = datetime.now(self.tz).date()
+        if self.today_readings:
+            first_day = datetime.fromtimestamp(self.today_readings[0][0], self.tz).date()
+            if first_day != today:
+                self.today_readings = []
+        self.today_readings.append((self.last_reading_at, self.current_uv_index))
+        self.data_version += 1
+    
+    def publish_snapshot(self):
+        """Publica la lectura actual en el snapshot compartido (mmap)"""
+        try:
+            now = time.time()
+            upcoming = [(epoch, uv) for epoch, uv in self.current_forecast if epoch >= now - 3600]
+            self.snapshot.publish(
+                self.current_uv_index,
+                self.current_provider or 'desconocido',
+                self.current_data_time,
+                self.is_dangerous,
+                self.uv_threshold,
+                upcoming,
+                # Hora de la lectura, no de la publicación: un checkpoint restaurado
+                # o una recarga de configuración no deben parecer una lectura nueva
+                updated_at=self.last_reading_at or 0.0
+            )
+        except Exception as e:
+            logger.error(f"Error publicando snapshot UV: {e}")
+    
+    async def ha_cycle(self):
+        """Ciclo en modo HA: el líder consulta y publica, todas las réplicas consumen"""
+        if self.leader_election.try_acquire():
+            # Se cuenta desde el último intento, no desde la última lectura publicada:
+            # con las APIs caídas se reintenta cada intervalo y no en cada sondeo
+            elapsed = time.time() - self.reading_bus.last_attempt_at()
+            
+            # El nuevo líder respeta la última consulta del anterior: sin llamadas extra
+            if self.should_check_uv() and elapsed >= self.check_interval * 60:
+                await asyncio.to_thread(self.reading_bus.record_attempt)
+                # Traza de la consulta del líder: las réplicas la continúan con el mismo trace_id
+                with tracer.trace('consulta_uv_ha', bot=self.name) as trace:
+                    with tracer.span('consulta_proveedor'):
+                        # Consulta HTTP bloqueante (timeouts de 15 s): fuera del event loop;
+                        # to_thread copia el contexto, así que sus spans caen en esta traza
+                        uv_index = await asyncio.to_thread(self.get_uv_data)
+                    if uv_index is not None:
+                        tracer.set_data_time(self.current_data_time)
+                        with tracer.span('publicar_lectura'):
+                            # flock bloqueante: fuera del event loop
+                            seq = await asyncio.to_thread(
+                                self.reading_bus.publish_reading,
+                                float(uv_index),
+                                provider=self.current_provider,
+                                data_time=self.current_data_time,
+                                forecast=self.current_forecast,
+                                confidence=self.current_confidence,
+                                trace_id=trace.trace_id
+                            )
+                        logger.info(f"Lectura UV #{seq} publicada para las réplicas")
+        
+        await self.consume_shared_reading()
+    
+    async def consume_shared_reading(self):
+        """Procesa la última lectura publicada por el líder, una sola vez por chat"""
+        reading = self.reading_bus.latest_reading()
+        seq = reading.get('seq', 0)
+        if seq <= self.last_reading_seq:
+            return
+        
+        try:
+            # Reclamar la lectura para este chat con un lock breve y no bloqueante;
+            # la entrega (red) se hace ya sin lock
+            result, chat_state = self.reading_bus.claim_chat(self.chat_id, seq)
+            if result == 'ocupado':
+                return
+            
+            self.current_provider = reading.get('provider')
+            self.current_data_time = reading.get('data_time')
+            self.current_forecast = [tuple(item) for item in reading.get('forecast', [])]
+            self.current_confidence = reading.get('confidence')
+            self.is_dangerous = chat_state.get('is_dangerous', self.is_dangerous)
+            self.morning_summary_sent_on = chat_state.get('morning_summary_sent_on', self.morning_summary_sent_on)
+            self.pending_alert = chat_state.get('pending_alert', self.pending_alert)
+            
+            if result == 'procesada':
+                # Otra réplica ya procesó esta lectura para este chat
+                self.current_uv_index = reading['uv_index']
+            else:
+                try:
+                    with tracer.trace('ciclo_uv_ha', trace_id=reading.get('trace_id'),
+                                      bot=self.name, seq=seq) as trace:
+                        tracer.set_data_time(self.current_data_time)
+                        # Tiempo que la lectura ha esperado en el bus hasta que esta réplica la recoge
+                        tracer.add_span('cola_lectura', reading.get('fetched_at') or trace.start, trace.start)
+                        await self.process_uv_reading(reading['uv_index'])
+                    self.log_trace_latency(trace)
+                finally:
+                    await asyncio.to_thread(self.reading_bus.finish_chat, self.chat_id, {
+                        'seq': seq,
+                        'is_dangerous': self.is_dangerous,
+                        'morning_summary_sent_on': self.morning_summary_sent_on,
+                        'pending_alert': self.pending_alert,
+                        'updated_at': datetime.now(self.tz).isoformat()
+                    })
+            
+            self.last_reading_seq = seq
+        except Exception as e:
+            logger.error(f"Error consumiendo lectura compartida: {e}")
+    
     async def send_alert(self, is_dangerous: bool):
         """Envía alerta según el estado"""
+        with tracer.span('render_mensaje', tipo='peligro' if is_dangerous else 'seguro'):
+            message = self.render_alert_message(is_dangerous)
+        
+        await self.send_telegram_message(message)
+        self.last_alert_sent = {
+            'tipo': 'peligro' if is_dangerous else 'seguro',
+            'uv': self.current_uv_index,
+            'at': datetime.now(self.tz).isoformat()
+        }
+    
+    def render_alert_message(self, is_dangerous: bool) -> str:
+        """Compone el mensaje de alerta o de vuelta a niveles seguros"""
         now = datetime.now(self.tz)
         level_desc, emoji = self.get_uv_level_description(self.current_uv_index)
         
@@ -256,10 +769,19 @@ class UVMonitor:
 🕐 Hora: {now.strftime('%H:%M')}
 📅 Fecha: {now.strftime('%d/%m/%Y')}"""
         
-        await self.send_telegram_message(message)
+        return message
     
     async def send_safe_alert(self):
         """Envía alerta cuando UV baja del umbral peligroso"""
+        with tracer.span('render_mensaje', tipo='seguro'):
+            message = self.render_safe_message()
+        
+        await self.send_telegram_message(message)
+        now = datetime.now(self.tz)
+        self.last_alert_sent = {'tipo': 'seguro', 'uv': self.current_uv_index, 'at': now.isoformat()}
+    
+    def render_safe_message(self) -> str:
+        """Compone el mensaje de UV por debajo del umbral"""
         now = datetime.now(self.tz)
         level_desc, emoji = self.get_uv_level_description(self.current_uv_index)
         
@@ -274,7 +796,7 @@ class UVMonitor:
 🕐 Hora: {now.strftime('%H:%M')}
 📅 Fecha: {now.strftime('%d/%m/%Y')}"""
         
-        await self.send_telegram_message(message)
+        return message
     
     def load_sunscreen_data(self) -> dict:
         """Carga datos de aplicación de protector solar"""
@@ -287,28 +809,37 @@ class UVMonitor:
             logger.error(f"Error cargando datos de protector solar: {e}")
             return {}
     
+    def load_stats(self):
+        """Carga los agregados guardados y siembra los días del histórico importado"""
+        self.stats.load()
+        history_file = os.getenv('UV_HISTORY_FILE', '/app/logs/uv_daily_history.json')
+        try:
+            if Path(history_file).exists():
+                with open(history_file, 'r') as f:
+                    seeded = self.stats.seed_from_history(json.load(f))
+                if seeded:
+                    logger.info(f"Estadísticas sembradas con {seeded} días del histórico")
+                    self.stats.save()
+        except Exception as e:
+            logger.error(f"Error sembrando estadísticas desde el histórico: {e}")
+    
     def save_sunscreen_data(self):
         """Guarda datos de aplicación de protector solar"""
         try:
-            Path(self.sunscreen_file).parent.mkdir(parents=True, exist_ok=True)
-            with open(self.sunscreen_file, 'w') as f:
+            path = Path(self.sunscreen_file)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Escritura atómica: un lector concurrente nunca ve el fichero a medias
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            with open(tmp, 'w') as f:
                 json.dump(self.sunscreen_data, f, indent=2)
+            os.replace(tmp, path)
         except Exception as e:
             logger.error(f"Error guardando datos de protector solar: {e}")
     
     def calculate_sunscreen_protection_time(self, spf: int, uv_index: float) -> int:
         """Calcula duración de protección del protector solar en minutos"""
         # Tiempo base de protección natural según tipo de piel (en minutos)
-        base_times = {
-            1: 67,   # Tipo I - Muy clara
-            2: 100,  # Tipo II - Clara  
-            3: 200,  # Tipo III - Media
-            4: 300,  # Tipo IV - Morena
-            5: 400,  # Tipo V - Muy morena
-            6: 500   # Tipo VI - Negra
-        }
-        
-        base_protection = base_times.get(self.skin_type, 100)
+        base_protection = BURN_BASE_MINUTES.get(self.skin_type, 100)
         
         # Ajuste por medicación fotosensibilizante (50% menos tiempo)
         base_protection *= 0.5
@@ -380,6 +911,7 @@ class UVMonitor:
             
             await update.message.reply_text(message, parse_mode='HTML')
             logger.info(f"Protector solar SPF {spf} aplicado a las {now.strftime('%H:%M')}")
+            await self.refresh_live_status()
             
         except Exception as e:
             logger.error(f"Error en comando /crema: {e}")
@@ -388,8 +920,19 @@ class UVMonitor:
     async def handle_status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Maneja comando /status para ver estado de protección"""
         try:
+            # En el chat con mensaje fijado, /status lo actualiza en lugar de responder;
+            # si no había nada que editar (o la edición queda aplazada) se responde igual
+            if self.live_status is not None and str(update.effective_chat.id) == str(self.chat_id):
+                if await self.refresh_live_status():
+                    return
+            
+            # Instantánea inmutable del estado: con updates concurrentes otro handler
+            # puede sustituir estos objetos, pero nunca modificarlos a medias
+            current_uv = self.current_uv_index
+            sunscreen = self.sunscreen_data
+            
             now = datetime.now(self.tz)
-            level_desc, emoji = self.get_uv_level_description(self.current_uv_index)
+            level_desc, emoji = self.get_uv_level_description(current_uv)
             
             # Información de horas UV
             uv_hours_info = ""
@@ -399,10 +942,10 @@ class UVMonitor:
                 uv_hours_info = f"🌙 <b>Fuera de horas UV</b> ({self.uv_start_hour}h-{self.uv_end_hour}h)"
             
             # Calcular tiempos de quemadura
-            normal_burn, photosensitive_burn = self.calculate_burn_times(self.current_uv_index)
+            normal_burn, photosensitive_burn = self.calculate_burn_times(current_uv)
             
             burn_info = ""
-            if self.current_uv_index > 0:
+            if current_uv > 0:
                 burn_info = f"""
 🔥 <b>Tiempo hasta quemadura:</b>
 • Piel normal: {normal_burn} min
@@ -410,15 +953,15 @@ class UVMonitor:
             
             message = f"""📊 <b>Estado UV - Vitoria-Gasteiz</b>
 
-🌞 <b>UV Actual:</b> {self.current_uv_index} ({level_desc} {emoji})
+🌞 <b>UV Actual:</b> {current_uv} ({level_desc} {emoji})
 🕐 <b>Hora:</b> {now.strftime('%H:%M')}
 {uv_hours_info}{burn_info}
 
 """
             
-            if self.sunscreen_data:
-                applied_time = datetime.fromisoformat(self.sunscreen_data['applied_at'])
-                expiry_time = datetime.fromisoformat(self.sunscreen_data['expires_at'])
+            if sunscreen:
+                applied_time = datetime.fromisoformat(sunscreen['applied_at'])
+                expiry_time = datetime.fromisoformat(sunscreen['expires_at'])
                 
                 if now < expiry_time:
                     time_left = expiry_time - now
@@ -426,7 +969,7 @@ class UVMonitor:
                     minutes, _ = divmod(remainder, 60)
                     
                     message += f"""🧴 <b>Protector Activo:</b>
-• SPF: {self.sunscreen_data['spf']}
+• SPF: {sunscreen['spf']}
 • Aplicado: {applied_time.strftime('%H:%M')}
 • Tiempo restante: {hours}h {minutes}m
 • Expira: {expiry_time.strftime('%H:%M')}
@@ -452,6 +995,95 @@ class UVMonitor:
             logger.error(f"Error en comando /status: {e}")
             await update.message.reply_text("❌ Error obteniendo estado.")
     
+    def render_stats_message(self) -> str:
+        """Resumen de hoy, la semana y el mes a partir de los agregados (sin recorrer lecturas)"""
+        now = datetime.now(self.tz)
+        lines = ["📊 <b>Estadísticas UV - Vitoria-Gasteiz</b>"]
+        
+        for level, title in (('dia', 'Hoy'), ('semana', 'Esta semana'), ('mes', 'Este mes')):
+            summary = self.stats.summary(level, now)
+            if summary is None:
+                lines.append(f"\n<b>{title}:</b> sin datos todavía")
+                continue
+            
+            peak_at = datetime.fromtimestamp(summary['peak_at'], self.tz)
+            peak_when = peak_at.strftime('%H:%M') if level == 'dia' else peak_at.strftime('%d/%m %H:%M')
+            lines.append(f"\n<b>{title}:</b>")
+            lines.append(f"• Pico: {summary['peak_uv']} ({peak_when})")
+            if summary['mean_uv'] is not None:
+                lines.append(f"• UV medio: {summary['mean_uv']}")
+            lines.append(f"• Horas sobre el umbral: {summary['hours_above']} h")
+            if level != 'dia':
+                lines.append(f"• Días sobre el umbral: {summary['days_above']}")
+                if summary['typical_peak_hour'] is not None:
+                    lines.append(f"• Hora típica del pico: {summary['typical_peak_hour']:02d}:00")
+        
+        lines.append(f"\n⚠️ Umbral: UV {self.uv_threshold}")
+        return "\n".join(lines)
+    
+    async def handle_stats_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Maneja comando /estadisticas"""
+        try:
+            await update.message.reply_text(self.render_stats_message(), parse_mode='HTML')
+        except Exception as e:
+            logger.error(f"Error en comando /estadisticas: {e}")
+            await update.message.reply_text("❌ Error obteniendo estadísticas.")
+    
+    async def render_today_chart(self, key) -> bytes:
+        """Renderiza la gráfica del día en un proceso aparte (una sola vez por clave)"""
+        if key in self.chart_renders:
+            return await self.chart_renders[key]
+        
+        if self.chart_pool is None:
+            self.chart_pool = create_render_pool()
+        
+        now = datetime.now(self.tz)
+        start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+        forecast = [(epoch, uv) for epoch, uv in self.current_forecast if epoch >= start_of_day]
+        
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(
+            self.chart_pool, render_day_chart,
+            list(self.today_readings), forecast, self.uv_threshold,
+            f"UV Vitoria-Gasteiz - {now.strftime('%d/%m/%Y')}"
+        )
+        self.chart_renders[key] = future
+        try:
+            return await future
+        finally:
+            self.chart_renders.pop(key, None)
+    
+    async def handle_chart_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Maneja comando /grafica con la curva UV del día"""
+        try:
+            if not self.today_readings and not self.current_forecast:
+                await update.message.reply_text("📈 Aún no hay datos UV de hoy.")
+                return
+            
+            now = datetime.now(self.tz)
+            key = ('vitoria-gasteiz', now.date().isoformat(), self.data_version)
+            caption = f"📈 UV de hoy - Actual: {self.current_uv_index} (umbral {self.uv_threshold})"
+            
+            # Reutilizar el file_id de Telegram: sin volver a subir la imagen
+            cached = self.chart_cache.get(key)
+            if cached and cached['file_id']:
+                await update.message.reply_photo(photo=cached['file_id'], caption=caption)
+                return
+            
+            png = cached['png'] if cached and cached['png'] else await self.render_today_chart(key)
+            self.chart_cache.put(key, png=png)
+            
+            sent = await update.message.reply_photo(photo=png, caption=caption)
+            if sent and sent.photo:
+                self.chart_cache.put(key, file_id=sent.photo[-1].file_id)
+            
+        except ImportError:
+            logger.error("matplotlib no está instalado: /grafica no disponible")
+            await update.message.reply_text("❌ Gráficas no disponibles en esta instalación.")
+        except Exception as e:
+            logger.error(f"Error en comando /grafica: {e}")
+            await update.message.reply_text("❌ Error generando la gráfica.")
+    
     def check_sunscreen_expiry(self) -> bool:
         """Verifica si necesita recordatorio de reaplicación"""
         if not self.sunscreen_data:
@@ -499,8 +1131,8 @@ class UVMonitor:
             
             await self.send_telegram_message(message)
             
-            # Marcar recordatorio como enviado
-            self.sunscreen_data['reminder_sent'] = True
+            # Marcar recordatorio como enviado (sustituyendo el dict, nunca mutándolo)
+            self.sunscreen_data = {**self.sunscreen_data, 'reminder_sent': True}
             self.save_sunscreen_data()
             
             logger.info("Recordatorio de protector solar enviado")
@@ -510,18 +1142,29 @@ class UVMonitor:
     async def setup_telegram_bot(self):
         """Configura el bot de Telegram con comandos"""
         try:
-            self.application = Application.builder().token(self.telegram_token).build()
+            builder = Application.builder().token(self.telegram_token)
+            if self.concurrent_updates > 0:
+                builder = builder.concurrent_updates(self.concurrent_updates)
+            self.application = builder.build()
             
-            # Registrar comandos
-            self.application.add_handler(CommandHandler("crema", self.handle_sunscreen_command))
-            self.application.add_handler(CommandHandler("protector", self.handle_sunscreen_command))
-            self.application.add_handler(CommandHandler("status", self.handle_status_command))
+            self.register_handlers(self.application)
             
-            logger.info("Bot de Telegram configurado con comandos: /crema, /protector, /status")
+            logger.info("Bot de Telegram configurado con comandos: /crema, /protector, /status, /grafica, "
+                        "/estadisticas, /planificar "
+                        f"(updates concurrentes: {self.concurrent_updates or 'no'})")
             
         except Exception as e:
             logger.error(f"Error configurando bot de Telegram: {e}")
     
+    def register_handlers(self, application: Application):
+        """Registra los comandos del bot en una Application"""
+        application.add_handler(CommandHandler("crema", self.handle_sunscreen_command))
+        application.add_handler(CommandHandler("protector", self.handle_sunscreen_command))
+        application.add_handler(CommandHandler("status", self.handle_status_command))
+        application.add_handler(CommandHandler("grafica", self.handle_chart_command))
+        application.add_handler(CommandHandler("estadisticas", self.handle_stats_command))
+        application.add_handler(CommandHandler("planificar", self.handle_plan_command))
+    
     async def start_bot_polling(self):
         """Inicia el polling del bot de Telegram"""
         try:
@@ -550,11 +1193,21 @@ class UVMonitor:
                 # Resetear datos de protector solar al cambio de día
                 self.reset_daily_sunscreen_data()
                 
+                # En modo HA el intervalo lo marca el líder; aquí solo se sondea el estado compartido
+                if self.ha_mode:
+                    await self.ha_cycle()
+                    await asyncio.sleep(self.ha_poll_seconds)
                 # Solo verificar UV durante horas de luz
-                if self.should_check_uv():
-                    await self.check_uv_and_alert()
+                elif self.should_check_uv():
+                    # Respetar el plazo restaurado del checkpoint
+                    wait = self.next_check_at - time.time()
+                    if wait > 0:
+                        await self.wait_for_schedule(min(wait, self.check_interval * 60))
+                        continue
+                    
+                    await self.run_scheduled_check()
                     logger.info(f"Chequeo UV completado - Próximo en {self.check_interval} minutos")
-                    await asyncio.sleep(self.check_interval * 60)
+                    await self.wait_for_schedule(self.check_interval * 60)
                 else:
                     # Fuera de horas UV, verificar cada hora si hemos entrado en horas UV
                     now = datetime.now(self.tz)
@@ -565,6 +1218,54 @@ class UVMonitor:
                 logger.error(f"Error en verificación UV: {e}")
                 await asyncio.sleep(60)  # Esperar 1 minuto antes de reintentar
     
+    async def wait_for_schedule(self, seconds: float):
+        """Espera hasta `seconds` o hasta que cambie la planificación"""
+        self.schedule_changed.clear()
+        try:
+            await asyncio.wait_for(self.schedule_changed.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+    
+    def apply_settings(self, settings: dict) -> list:
+        """Aplica ajustes ya validados de una vez (sin awaits: atómico para el event loop)"""
+        changes = []
+        
+        if 'UV_THRESHOLD' in settings and settings['UV_THRESHOLD'] != self.uv_threshold:
+            changes.append(f"umbral {self.uv_threshold} → {settings['UV_THRESHOLD']}")
+            self.uv_threshold = settings['UV_THRESHOLD']
+            self.stats.threshold = self.uv_threshold
+            # La gráfica dibuja el umbral: invalidar la versión en caché
+            self.data_version += 1
+        
+        if 'SKIN_TYPE' in settings and settings['SKIN_TYPE'] != self.skin_type:
+            changes.append(f"tipo de piel {self.skin_type} → {settings['SKIN_TYPE']}")
+            self.skin_type = settings['SKIN_TYPE']
+        
+        if 'CHECK_INTERVAL_MINUTES' in settings and settings['CHECK_INTERVAL_MINUTES'] != self.check_interval:
+            changes.append(f"intervalo {self.check_interval} → {settings['CHECK_INTERVAL_MINUTES']} min")
+            # Reprogramar el siguiente chequeo desde el último con el nuevo intervalo
+            if self.next_check_at:
+                last_check_at = self.next_check_at - self.check_interval * 60
+                self.next_check_at = last_check_at + settings['CHECK_INTERVAL_MINUTES'] * 60
+            self.check_interval = settings['CHECK_INTERVAL_MINUTES']
+            self.schedule_changed.set()
+        
+        if changes:
+            self.publish_snapshot()
+            self.save_checkpoint()
+            # El mensaje fijado muestra el umbral: reeditarlo sin esperar a la próxima lectura
+            try:
+                self.settings_refresh_task = asyncio.get_running_loop().create_task(self.refresh_live_status())
+            except RuntimeError:
+                pass
+        return changes
+    
+    async def run_scheduled_check(self):
+        """Ejecuta un chequeo y programa el siguiente"""
+        self.next_check_at = time.time() + self.check_interval * 60
+        await self.check_uv_and_alert()
+        self.save_checkpoint()
+    
     async def run_async(self):
         """Ejecuta el monitor de forma asíncrona"""
         try:
@@ -574,8 +1275,23 @@ class UVMonitor:
             # Iniciar bot polling
             await self.start_bot_polling()
             
-            # Primera verificación
-            await self.check_uv_and_alert()
+            # Restaurar estado previo: evita alertas duplicadas y consultas extra
+            self.restore_checkpoint()
+            
+            # API local HTTP/SSE
+            await self.start_local_api()
+            
+            # Recarga de configuración en caliente (SIGHUP o cambios en el fichero)
+            self.config_reloader = ConfigReloader(
+                self,
+                self.setting('CONFIG_FILE', '/app/config/uv_monitor.env'),
+                poll_seconds=float(self.setting('CONFIG_POLL_SECONDS', '10'))
+            )
+            self.config_reloader.start()
+            
+            # Primera verificación (en modo HA la hace el worker a través del líder)
+            if not self.ha_mode and time.time() >= self.next_check_at:
+                await self.run_scheduled_check()
             
             # Ejecutar worker de verificación UV
             await self.uv_check_worker()
@@ -587,6 +1303,17 @@ class UVMonitor:
         finally:
             # Limpiar recursos
             await self.stop_bot_polling()
+            if self.config_reloader:
+                self.config_reloader.stop()
+            if self.local_api:
+                await self.local_api.stop()
+            self.save_checkpoint()
+            self.leader_election.release()
+            self.snapshot.close()
+            if self.chart_pool:
+                self.chart_pool.shutdown(wait=False)
+            if self.live_status:
+                self.live_status.cancel()
     
     def run(self):
         """Ejecuta el monitor"""
@@ -595,6 +1322,8 @@ class UVMonitor:
         logger.info(f"Tipo de piel: {self.skin_type}")
         logger.info(f"Intervalo de chequeo: {self.check_interval} minutos")
         logger.info(f"Horas de monitoreo UV: {self.uv_start_hour}:00 - {self.uv_end_hour}:00")
+        if self.ha_mode:
+            logger.info(f"Modo HA activo - estado compartido en {self.reading_bus.state_file}")
         
         # Verificar si estamos en horas UV al iniciar
         if self.is_uv_hours():
@@ -608,6 +1337,10 @@ class UVMonitor:
 
 def main():
     """Función principal"""
+    # Configuración de logging (cola + escritor en segundo plano con rotación). Aquí y no
+    # al importar: los procesos del pool de render importan este módulo como __mp_main__
+    setup_logging_from_env()
+    
     # Verificar variables de entorno necesarias
     required_env = ['TELEGRAM_BOT_TOKEN', 'TELEGRAM_CHAT_ID']
     missing = [var for var in required_env if not os.getenv(var)]
@@ -0,0 +1,155 @@
+"""
+Snapshot en memoria compartida de la última lectura UV del monitor.
+
+Fichero de tamaño fijo mapeado con mmap. El monitor escribe y los procesos
+locales (check_uv_now.py, estimate_uv_now.py...) leen sin red ni IPC.
+La consistencia se garantiza con un seqlock: el contador es impar mientras
+se escribe y el lector reintenta si cambia durante la lectura. Varias
+réplicas (modo HA) pueden escribir el mismo fichero: los escritores se
+serializan con flock y continúan la secuencia que haya en el fichero; los
+lectores no toman ningún lock.
+"""
+
+import fcntl
+import mmap
+import os
+import struct
+import time
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_SNAPSHOT_FILE = os.getenv('UV_SNAPSHOT_FILE', '/app/logs/uv_snapshot.bin')
+
+MAGIC = b'UVSN'
+VERSION = 1
+FORECAST_SLOTS = 12
+
+# magic, versión, seq, timestamp lectura, timestamp datos proveedor, uv, umbral,
+# peligroso, nº previsiones, proveedor (16 bytes)
+_HEADER = struct.Struct('<4sHxxQddffBB16s')
+_FORECAST = struct.Struct('<df')
+SNAPSHOT_SIZE = _HEADER.size + FORECAST_SLOTS * _FORECAST.size
+
+
+class SnapshotWriter:
+    """Publica la última lectura en el fichero mapeado"""
+
+    def __init__(self, path: str = DEFAULT_SNAPSHOT_FILE):
+        self.path = path
+        self._mm = None
+        self._fd = None
+        self._seq = 0
+
+    def _open(self):
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        # El descriptor se mantiene abierto para el flock entre escritores
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self._fd).st_size != SNAPSHOT_SIZE:
+                os.ftruncate(self._fd, SNAPSHOT_SIZE)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._mm = mmap.mmap(self._fd, SNAPSHOT_SIZE)
+
+    def publish(self, uv_index: float, provider: str, data_time: Optional[float],
+                is_dangerous: bool, threshold: float, forecast=None, updated_at: Optional[float] = None):
+        """Escribe la lectura. forecast: lista de (epoch, uv); updated_at: hora de la lectura (por defecto, ahora)"""
+        if updated_at is None:
+            updated_at = time.time()
+        if self._mm is None:
+            self._open()
+
+        forecast = list(forecast or [])[:FORECAST_SLOTS]
+
+        # Un solo escritor a la vez (microsegundos); se continúa la secuencia del fichero,
+        # que puede haber avanzado otra réplica. Impar: un escritor murió a medias
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            self._write_locked(uv_index, provider, data_time, is_dangerous, threshold, forecast, updated_at)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _write_locked(self, uv_index, provider, data_time, is_dangerous, threshold, forecast, updated_at):
+        header = _HEADER.unpack_from(self._mm, 0)
+        current = header[2] if header[0] == MAGIC else 0
+        self._seq = current + (current & 1)
+
+        # seq impar: escritura en curso
+        self._seq += 1
+        struct.pack_into('<Q', self._mm, 8, self._seq)
+
+        _HEADER.pack_into(
+            self._mm, 0, MAGIC, VERSION, self._seq, updated_at,
+            data_time or 0.0, float(uv_index), float(threshold),
+            1 if is_dangerous else 0, len(forecast),
+            provider.encode('utf-8')[:16]
+        )
+        offset = _HEADER.size
+        for epoch, uv in forecast:
+            _FORECAST.pack_into(self._mm, offset, float(epoch), float(uv))
+            offset += _FORECAST.size
+
+        # seq par: escritura completa
+        self._seq += 1
+        struct.pack_into('<Q', self._mm, 8, self._seq)
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+def read_snapshot(path: str = DEFAULT_SNAPSHOT_FILE, max_age_minutes: Optional[float] = None) -> Optional[dict]:
+    """Lee el snapshot. Devuelve None si no existe, es inválido o está desactualizado"""
+    try:
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < SNAPSHOT_SIZE:
+                return None
+            mm = mmap.mmap(f.fileno(), SNAPSHOT_SIZE, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        for _ in range(100):
+            seq_before = struct.unpack_from('<Q', mm, 8)[0]
+            if seq_before & 1:
+                time.sleep(0.001)
+                continue
+
+            raw = mm[:SNAPSHOT_SIZE]
+
+            if struct.unpack_from('<Q', mm, 8)[0] == seq_before:
+                break
+        else:
+            return None
+    finally:
+        mm.close()
+
+    (magic, version, _seq, updated_at, data_time, uv, threshold,
+     dangerous, n_forecast, provider) = _HEADER.unpack_from(raw, 0)
+    if magic != MAGIC or version != VERSION:
+        return None
+
+    if max_age_minutes is not None and time.time() - updated_at > max_age_minutes * 60:
+        return None
+
+    forecast = []
+    offset = _HEADER.size
+    for _ in range(min(n_forecast, FORECAST_SLOTS)):
+        epoch, uv_forecast = _FORECAST.unpack_from(raw, offset)
+        forecast.append((epoch, round(uv_forecast, 2)))
+        offset += _FORECAST.size
+
+    return {
+        'uv_index': round(uv, 2),
+        'provider': provider.rstrip(b'\0').decode('utf-8', errors='replace'),
+        'updated_at': updated_at,
+        'data_time': data_time or None,
+        'threshold': round(threshold, 2),
+        'is_dangerous': bool(dangerous),
+        'forecast': forecast,
+    }
@@ -0,0 +1,198 @@
+"""
+Estadísticas UV incrementales para /estadisticas.
+
+Mantiene agregados por hora, día, semana ISO y mes que se actualizan en
+tiempo constante con cada lectura: pico, minutos sobre el umbral, media,
+días sobre el umbral e histograma de la hora del pico diario. Las consultas
+solo leen los agregados ya calculados, sin recorrer lecturas crudas. Los
+agregados se persisten de forma atómica y pueden sembrarse con el histórico
+diario importado por import_log_history.py.
+"""
+
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Hueco máximo entre lecturas que se cuenta como tiempo sobre el umbral
+MAX_GAP_MINUTES = 60
+
+# Nº de periodos que se conservan por nivel
+RETENTION = {'hora': 48, 'dia': 400, 'semana': 110, 'mes': 26}
+
+
+def _new_bucket() -> dict:
+    return {
+        'peak_uv': 0.0,
+        'peak_at': None,
+        'minutes_above': 0.0,
+        'readings': 0,
+        'uv_sum': 0.0,
+        'days_above': 0,
+        'peak_hours': [0] * 24,
+    }
+
+
+class RollingStats:
+    """Agregados horarios, diarios, semanales y mensuales actualizados por lectura"""
+
+    def __init__(self, path: str, threshold: float, tz):
+        self.path = path
+        self.threshold = threshold
+        self.tz = tz
+        self.levels = {level: {} for level in RETENTION}
+        self.last_reading = None  # (epoch, uv)
+
+    @staticmethod
+    def keys_for(when: datetime) -> dict:
+        year, week, _ = when.isocalendar()
+        return {
+            'hora': when.strftime('%Y-%m-%dT%H'),
+            'dia': when.date().isoformat(),
+            'semana': f"{year}-W{week:02d}",
+            'mes': when.strftime('%Y-%m'),
+        }
+
+    def _bucket(self, level: str, key: str) -> dict:
+        buckets = self.levels[level]
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = _new_bucket()
+            # Las claves ISO ordenan cronológicamente: se descarta el periodo más antiguo,
+            # no el primero insertado (la siembra añade días antiguos al final)
+            while len(buckets) > RETENTION[level]:
+                del buckets[min(buckets)]
+        return bucket
+
+    def add(self, epoch: float, uv: float):
+        """Incorpora una lectura: O(1) independientemente del histórico"""
+        when = datetime.fromtimestamp(epoch, self.tz)
+        keys = self.keys_for(when)
+
+        minutes_above = 0.0
+        if self.last_reading is not None:
+            last_epoch, last_uv = self.last_reading
+            gap = (epoch - last_epoch) / 60
+            same_day = datetime.fromtimestamp(last_epoch, self.tz).date() == when.date()
+            if same_day and 0 < gap <= MAX_GAP_MINUTES and last_uv >= self.threshold:
+                minutes_above = gap
+        self.last_reading = (epoch, uv)
+
+        day = self._bucket('dia', keys['dia'])
+        previous_peak_at = day['peak_at']
+        was_above = day['days_above'] > 0
+
+        for level, key in keys.items():
+            bucket = self._bucket(level, key)
+            bucket['readings'] += 1
+            bucket['uv_sum'] += uv
+            bucket['minutes_above'] += minutes_above
+            if uv > bucket['peak_uv'] or bucket['peak_at'] is None:
+                bucket['peak_uv'] = uv
+                bucket['peak_at'] = epoch
+
+        # Propagar a semana y mes los cambios del pico del día
+        is_above = day['peak_uv'] >= self.threshold
+        if day['peak_at'] != previous_peak_at:
+            self._move_peak_hour(keys, previous_peak_at, day['peak_at'])
+        if is_above and not was_above:
+            for level in ('semana', 'mes'):
+                self._bucket(level, keys[level])['days_above'] += 1
+            day['days_above'] = 1
+
+    def _move_peak_hour(self, keys: dict, old_epoch: Optional[float], new_epoch: float):
+        new_hour = datetime.fromtimestamp(new_epoch, self.tz).hour
+        old_hour = datetime.fromtimestamp(old_epoch, self.tz).hour if old_epoch else None
+        for level in ('dia', 'semana', 'mes'):
+            hours = self._bucket(level, keys[level])['peak_hours']
+            if old_hour is not None:
+                hours[old_hour] -= 1
+            hours[new_hour] += 1
+
+    def seed_from_history(self, history: dict) -> int:
+        """Siembra días del histórico importado que aún no tengan agregado"""
+        seeded = 0
+        days = self.levels['dia']
+        # Del más reciente al más antiguo: se siembra solo lo que cabe sin desplazar días
+        for day_key in sorted(history, reverse=True)[:RETENTION['dia']]:
+            if day_key in days:
+                continue
+            # Nivel diario lleno de días más recientes: los anteriores o ya se contaron y se
+            # descartaron (su semana y su mes siguen incluyéndolos) o no caben
+            if len(days) >= RETENTION['dia'] and day_key < min(days):
+                break
+            entry = history[day_key]
+            try:
+                peak_time = entry.get('peak_time') or '13:00'
+                when = self.tz.localize(datetime.strptime(f"{day_key} {peak_time}", '%Y-%m-%d %H:%M'))
+            except (ValueError, TypeError):
+                continue
+
+            keys = self.keys_for(when)
+            peak_uv = float(entry.get('peak_uv', 0.0))
+            above = 1 if peak_uv >= self.threshold else 0
+            for level in ('dia', 'semana', 'mes'):
+                bucket = self._bucket(level, keys[level])
+                bucket['minutes_above'] += entry.get('minutes_above_threshold', 0)
+                bucket['days_above'] += above
+                bucket['peak_hours'][when.hour] += 1
+                if peak_uv > bucket['peak_uv'] or bucket['peak_at'] is None:
+                    bucket['peak_uv'] = peak_uv
+                    bucket['peak_at'] = when.timestamp()
+            seeded += 1
+
+        if seeded:
+            # Los días sembrados se insertan al final: reordenar una vez por clave
+            for level in ('dia', 'semana', 'mes'):
+                self.levels[level] = dict(sorted(self.levels[level].items()))
+        return seeded
+
+    def summary(self, level: str, when: Optional[datetime] = None) -> Optional[dict]:
+        """Resumen del periodo que contiene `when` (por defecto, ahora)"""
+        when = when or datetime.now(self.tz)
+        bucket = self.levels[level].get(self.keys_for(when)[level])
+        if not bucket or bucket['peak_at'] is None:
+            return None
+
+        hours = bucket['peak_hours']
+        typical_hour = max(range(24), key=hours.__getitem__) if any(hours) else None
+        return {
+            'peak_uv': bucket['peak_uv'],
+            'peak_at': bucket['peak_at'],
+            'hours_above': round(bucket['minutes_above'] / 60, 1),
+            'days_above': bucket['days_above'],
+            # Solo las lecturas en vivo tienen media; los días sembrados aportan pico y minutos
+            'mean_uv': round(bucket['uv_sum'] / bucket['readings'], 1) if bucket['readings'] else None,
+            'typical_peak_hour': typical_hour,
+        }
+
+    def save(self):
+        """Escribe los agregados: fichero temporal + rename"""
+        try:
+            path = Path(self.path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            with open(tmp, 'w') as f:
+                json.dump({'levels': self.levels, 'last_reading': self.last_reading}, f)
+            os.replace(tmp, path)
+        except Exception as e:
+            logger.error(f"Error guardando estadísticas UV: {e}")
+
+    def load(self) -> bool:
+        try:
+            if not Path(self.path).exists():
+                return False
+            with open(self.path, 'r') as f:
+                state = json.load(f)
+            for level in RETENTION:
+                self.levels[level] = state.get('levels', {}).get(level, {})
+            last = state.get('last_reading')
+            self.last_reading = tuple(last) if last else None
+            return True
+        except Exception as e:
+            logger.error(f"Error cargando estadísticas UV: {e}")
+            return False